@@ -0,0 +1,54 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+import argparse
+import json
+import logging
+
+from taren.benchmark import Benchmark
+
+# Measure performance of TaRen with synthetic data, no network required
+if __name__ == "__main__":
+    PARSER = argparse.ArgumentParser(description="Benchmark TaRen with synthetic episode and team pages and download folders")
+    PARSER.add_argument("--episodes", type=int, default=1300, help="number of episodes in synthetic episode page")
+    PARSER.add_argument("--teams", type=int, default=100, help="number of teams in synthetic team page")
+    PARSER.add_argument("--downloads", type=int, default=1000, help="number of files in synthetic download folder")
+    PARSER.add_argument("--seed", type=int, default=0, help="seed of random generator")
+    PARSER.add_argument("--workers", type=int, default=4, help="number of worker processes for parallel parsing")
+    PARSER.add_argument("--output", default="", help="write JSON results to file instead of stdout")
+    PARSER.add_argument("--loglevel", default="warning", help="log level of TaRen during benchmark")
+    ARGS = PARSER.parse_args()
+
+    logging.basicConfig(level=ARGS.loglevel.upper())
+
+    BENCHMARK: Benchmark = Benchmark(ARGS.episodes, ARGS.teams, ARGS.downloads, ARGS.seed, ARGS.workers)
+    RESULTS: dict = BENCHMARK.run()
+
+    if ARGS.output:
+        with open(ARGS.output, "w") as file:
+            json.dump(RESULTS, file, indent=4)
+    else:
+        print(json.dumps(RESULTS, indent=4))
@@ -24,28 +24,51 @@ SOFTWARE.
 ******************************************************************************
 """
 
+import argparse
 import logging.config
+import logging.handlers
 import logging
 import platform
+import queue
 import sys
 
 from taren.taren import TaRen
 from taren.tarenconfig import TarenConfig
 from taren.grouping import Grouping
-
-TAREN_CONFIG = TarenConfig("program.json")
-TAREN_CONFIG.save()
-
-# Setup logging for dealing with UTF-8, unfortunately not available for basicConfig
-LOGGER_SETUP = logging.getLogger()
-loglevel: str = TAREN_CONFIG.value_get("logging", "loglevel").upper()
-LOGGER_SETUP.setLevel(loglevel)
-LOGGER_HANDLER = logging.FileHandler(TAREN_CONFIG.value_get("logging", "logfile"), "w", "utf-8")
-LOGGER_HANDLER.setFormatter(logging.Formatter(TAREN_CONFIG.value_get("logging", "logstring")))
-LOGGER_SETUP.addHandler(LOGGER_HANDLER)
+from taren.profiler import Profiler
+from taren.ratelimitfilter import RateLimitFilter
+from taren.watcher import Watcher
+from taren.websitecache import WebSiteCache
 
 # Script to rename files downloaded with MediathekView to a specific format
 if __name__ == "__main__":
+    # Setup only in main process, worker processes for parsing import this module too
+    TAREN_CONFIG = TarenConfig("program.json")
+    TAREN_CONFIG.save()
+
+    # Setup logging for dealing with UTF-8, unfortunately not available for basicConfig
+    LOGGER_SETUP = logging.getLogger()
+    loglevel: str = TAREN_CONFIG.value_get("logging", "loglevel").upper()
+    LOGGER_SETUP.setLevel(loglevel)
+    LOGGER_HANDLER = logging.FileHandler(TAREN_CONFIG.value_get("logging", "logfile"), "w", "utf-8")
+    LOGGER_HANDLER.setFormatter(logging.Formatter(TAREN_CONFIG.value_get("logging", "logstring")))
+
+    # File is written by a separate thread, records are only queued by the caller
+    LOGGER_QUEUE: queue.SimpleQueue = queue.SimpleQueue()
+    LOGGER_LIMIT = RateLimitFilter(int(TAREN_CONFIG.value_get("logging", "ratelimit")), float(TAREN_CONFIG.value_get("logging", "ratelimit_interval")))
+    LOGGER_QUEUE_HANDLER = logging.handlers.QueueHandler(LOGGER_QUEUE)
+    LOGGER_QUEUE_HANDLER.addFilter(LOGGER_LIMIT)
+    LOGGER_SETUP.addHandler(LOGGER_QUEUE_HANDLER)
+    LOGGER_LISTENER = logging.handlers.QueueListener(LOGGER_QUEUE, LOGGER_HANDLER)
+    LOGGER_LISTENER.start()
+
+    PARSER = argparse.ArgumentParser(description="Rename Tatort downloads of MediathekView")
+    PARSER.add_argument("--watch", action="store_true", help="keep running and rename new downloads as soon as they are completed")
+    PARSER.add_argument("--prefetch", action="store_true", help="only refresh the cached web pages, e.g. as separate job before the renaming")
+    PARSER.add_argument("--profile", action="store_true", help="profile the run with cProfile, overrides config")
+    PARSER.add_argument("--tracemalloc", action="store_true", help="trace allocations while parsing the web pages, overrides config")
+    ARGS = PARSER.parse_args()
+
     logging.debug("startup")
 
     logging.info("Running TaRen with the following settings:")
@@ -63,10 +86,38 @@ if __name__ == "__main__":
     # - Maximum age in days of cache file
     # - Trash folder
     # - Days to keep downloads/episodes in trash folder
-    DATA = TaRen(TAREN_CONFIG)
+    PROFILER: Profiler = Profiler(
+        TAREN_CONFIG.value_get("logging", "logfile"),
+        ARGS.profile or "true" == TAREN_CONFIG.value_get("profiling", "cprofile").lower(),
+        ARGS.tracemalloc or "true" == TAREN_CONFIG.value_get("profiling", "tracemalloc").lower(),
+        int(TAREN_CONFIG.value_get("profiling", "top")),
+    )
 
-    # Start magic process :D
-    DATA.rename_process()
+    try:
+        DATA = TaRen(TAREN_CONFIG, PROFILER)
+        if ARGS.prefetch:
+            # Refresh cached web pages only
+            DATA.refresh_catalogs()
+        # Start magic process :D
+        elif PROFILER.profile("rename_process", DATA.rename_process) and ARGS.watch:
+            # Keep running and handle new downloads
+            WATCHER: Watcher = Watcher(
+                DATA,
+                float(TAREN_CONFIG.value_get("taren", "watch_interval")),
+                float(TAREN_CONFIG.value_get("taren", "watch_debounce")),
+                float(TAREN_CONFIG.value_get("taren", "watch_reload")),
+            )
+            WATCHER.run()
+    except Exception:
+        # Log errors, including those of the setup, before the listener is stopped
+        logging.exception("TaRen stopped with error")
+        raise
+    finally:
+        # Let refreshes of outdated web pages finish and log their result
+        WebSiteCache.wait_for_refreshes()
+        # Write remaining records to file
+        LOGGER_LIMIT.report()
+        LOGGER_LISTENER.stop()
 
     # Create page with grouped information
     # GROUPING: Grouping = Grouping(TAREN_CONFIG)
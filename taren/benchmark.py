@@ -0,0 +1,259 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+import logging
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from taren.download import Download
+from taren.downloadlist import DownloadList
+from taren.episode import Episode
+from taren.episodelist import EpisodeList
+from taren.executor import Executor
+from taren.grouping import Grouping
+from taren.helper import Helper
+from taren.journal import Journal
+from taren.operation import Operation
+from taren.planner import Planner
+from taren.stats import Stats
+from taren.teamlist import TeamList
+from taren.trash import Trash
+
+
+class Benchmark:
+    """
+    Measure the phases of TaRen with synthetic Wikipedia pages and download
+    folders. Only local files inside a temporary folder are used.
+    """
+
+    # Words for synthetic episode titles
+    _words: list[str] = [
+        "Taxi", "Leipzig", "Reifezeugnis", "Tod", "All", "Fall", "Haie", "Helgoland", "Krähe", "Blut", "Nacht", "Schatten",
+        "Spiel", "Feuer", "Wasser", "Schuld", "Sühne", "Mord", "Stadt", "Land", "Fluss", "Kinder", "Wolf", "Engel",
+    ]
+    # Surnames of synthetic inspectors
+    _inspectors: list[str] = [
+        "Trimmel", "Kressin", "Schimanski", "Thanner", "Borowski", "Brandt", "Odenthal", "Kopper", "Ballauf", "Schenk",
+        "Thiel", "Boerne", "Lürsen", "Stedefreund", "Murot", "Faber", "Bönisch", "Lannert", "Bootz", "Falke",
+    ]
+    # Broadcasting stations
+    _stations: list[str] = ["BR", "HR", "MDR", "NDR", "RB", "RBB", "SR", "SWR", "WDR", "ORF", "SRF"]
+
+    ############################################################################
+    def __init__(self: object, episodes: int, teams: int, downloads: int, seed: int = 0, workers: int = 4) -> None:
+        """
+        Default init of variables
+        """
+        self._episode_count: int = episodes
+        self._team_count: int = teams
+        self._download_count: int = downloads
+        self._seed: int = seed
+        self._workers: int = workers
+        self._random: random.Random = random.Random(seed)
+        self._results: list[dict] = []
+        # Synthetic teams as (begin, end, inspectors)
+        self._teams: list[tuple[int, int, list[str]]] = []
+
+    ############################################################################
+    def _get_title(self: object, number: int) -> str:
+        """
+        Synthetic title of an episode, unique by the roman number at the end
+        """
+        words: list[str] = self._random.sample(Benchmark._words, self._random.randint(1, 3))
+        return "{} {}".format(" ".join(words), number)
+
+    ############################################################################
+    def build_episode_page(self: object) -> str:
+        """
+        Episode table in the layout of the Wikipedia list of episodes:
+        number, title, station, date, inspectors, case number. Each episode
+        belongs to one of the teams created by build_team_page.
+        """
+        rows: list[str] = ["<tr><th>Nr.</th><th>Titel</th><th>Sender</th><th>Erstausstrahlung</th><th>Ermittler</th><th>Fall</th></tr>"]
+        for number in range(1, self._episode_count + 1):
+            begin, end, inspectors = self._random.choice(self._teams)
+            year: int = self._random.randint(begin, end)
+            inspector_names: str = ", ".join(inspectors)
+            if 0 == number % 50:
+                inspector_names = "{} (Gastauftritt {})".format(inspector_names, self._random.choice(Benchmark._inspectors))
+            title: str = self._get_title(number)
+            if 0 == number % 70:
+                title = "{} (Folge {} trägt den gleichen Titel)".format(title, number - 1)
+            rows.append(
+                '<tr><td>{}</td><td><a href="/wiki/Tatort:_Folge_{}">{}</a></td><td>{}</td><td>{:02d}.{:02d}.{}</td><td>{}</td><td>{} ({})</td></tr>'.format(
+                    number, number, title, self._random.choice(Benchmark._stations), self._random.randint(1, 28), self._random.randint(1, 12), year, inspector_names, self._random.randint(1, 50), self._random.randint(1, 9)
+                )
+            )
+        return "<html><head><title>Liste der Tatort-Folgen</title></head><body><table>\n{}\n</table></body></html>".format("\n".join(rows))
+
+    ############################################################################
+    def build_team_page(self: object) -> str:
+        """
+        Team table in the layout of the Wikipedia list of inspectors:
+        period, inspectors, two unused columns, location, number of episodes
+        """
+        rows: list[str] = ["<tr><th>Zeitraum</th><th>Ermittler</th><th>Darsteller</th><th>Anstalt</th><th>Ort</th><th>Folgen</th></tr>"]
+        self._teams = []
+        for number in range(max(self._team_count, 1)):
+            begin: int = self._random.randint(1970, 2020)
+            end: int = min(begin + self._random.randint(0, 15), date.today().year)
+            if begin == end:
+                period: str = "{}".format(begin)
+            elif self._random.random() < 0.2:
+                end = date.today().year
+                period = "seit {}".format(begin)
+            else:
+                period = "{}–{}".format(begin, end)
+            inspectors: list[str] = self._random.sample(Benchmark._inspectors, self._random.randint(1, 2))
+            self._teams.append((begin, end, inspectors))
+            rows.append(
+                "<tr><td>{}</td><td>{}</td><td>Darsteller</td><td>{}</td><td>Stadt {} (Land)</td><td>{}</td></tr>".format(
+                    period, ", ".join("Kommissar {}".format(name) for name in inspectors), self._random.choice(Benchmark._stations), number, self._random.randint(1, 90)
+                )
+            )
+        return "<html><head><title>Liste der Tatort-Ermittler</title></head><body><table>\n{}\n</table></body></html>".format("\n".join(rows))
+
+    ############################################################################
+    def build_downloads(self: object, folder: str, episodes: list[Episode], extension: str) -> None:
+        """
+        Create empty download files in all naming styles handled by
+        Episode.matches: leading number, dailymotion, TaRen prefix, title
+        """
+        names: set[str] = set()
+        for number in range(self._download_count):
+            episode: Episode = self._random.choice(episodes)
+            style: int = number % 5
+            if 0 == style:
+                name = "{:04d} Tatort {}".format(episode.episode_id, episode.episode_name)
+            elif 1 == style:
+                name = "Tatort_E{:03d}_{}_{}".format(episode.episode_id, episode.episode_name, number)
+            elif 2 == style:
+                name = "{}".format(episode)
+            elif 3 == style:
+                name = "Film & Serie-Tatort-{}-{}".format(episode.episode_name, number)
+            else:
+                name = "Tatort-Unbekannt-{}".format(number)
+            names.add("{}{}".format(name, extension))
+        for name in names:
+            with open(os.path.join(folder, name), "wb") as file:
+                # Different sizes for SD and HD variants
+                file.write(b"x" * self._random.randint(0, 3))
+
+    ############################################################################
+    def _measure(self: object, phase: str, items: int, function: callable) -> object:
+        """
+        Measure wall and CPU time of a phase, without number of items the
+        length of the result is used
+        """
+        wall: float = time.perf_counter()
+        cpu: float = time.process_time()
+        result: object = function()
+        if items is None:
+            items = len(result)
+        self._results.append({"phase": phase, "items": items, "wall": time.perf_counter() - wall, "cpu": time.process_time() - cpu})
+        logging.info("benchmark {}".format(self._results[-1]))
+        return result
+
+    ############################################################################
+    def _parse_parallel(self: object, episodepage: str, teampage: str, cachedir: str) -> None:
+        """
+        Parse both pages with a pool of worker processes, including its startup
+        """
+        with ProcessPoolExecutor(max_workers=self._workers, mp_context=Helper.get_process_context()) as processes:
+            EpisodeList("Tatort", "", 0, "", cachedir=cachedir).get_episodes(episodepage, processes)
+            TeamList("Teams", "", 0, "", cachedir=cachedir).get_teams(teampage, processes)
+
+    ############################################################################
+    def run(self: object) -> dict:
+        """
+        Run all phases in a temporary folder, return machine readable results
+        """
+        workdir: str = tempfile.mkdtemp(prefix="taren-benchmark-")
+        currentdir: str = os.getcwd()
+        extension: str = ".mp4"
+        try:
+            # Cache files are created in the current folder
+            os.chdir(workdir)
+            teampage: str = self.build_team_page()
+            episodepage: str = self.build_episode_page()
+            downloaddir: str = os.path.join(workdir, "downloads")
+            os.makedirs(downloaddir)
+
+            # Parse pages, cold and with snapshot
+            episode_list: EpisodeList = EpisodeList("Tatort", "", 0, "")
+            self._measure("parse_episodes", self._episode_count, lambda: episode_list.get_episodes(episodepage))
+            self._measure("parse_episodes_snapshot", self._episode_count, lambda: EpisodeList("Tatort", "", 0, "").get_episodes(episodepage))
+            team_list: TeamList = TeamList("Teams", "", 0, "")
+            self._measure("parse_teams", self._team_count, lambda: team_list.get_teams(teampage))
+
+            # Parse both pages with worker processes, without the snapshots of the previous phases
+            paralleldir: str = os.path.join(workdir, "parallel")
+            os.makedirs(paralleldir)
+            self._measure("parse_parallel", self._episode_count + self._team_count, lambda: self._parse_parallel(episodepage, teampage, paralleldir))
+
+            # Build and list downloads
+            episodes: list[Episode] = [episode_list.find_episode("{:04d} ".format(number)) for number in range(1, self._episode_count + 1)]
+            self.build_downloads(downloaddir, [episode for episode in episodes if not episode.empty], extension)
+            trash: Trash = Trash(downloaddir, ".trash", 0, ".ignore")
+            download_list: DownloadList = DownloadList(downloaddir, "Tatort", extension, False, [trash.get_folder()])
+            # Names of synthetic downloads are unique, so the actual count may be lower
+            downloads: list[Download] = self._measure("list_downloads", None, download_list.get_downloads)
+
+            # Match and plan
+            planner: Planner = Planner(episode_list, extension)
+            matched: list[tuple[Download, Episode]] = self._measure("match", len(downloads), lambda: planner.match(downloads))
+            operations: list[Operation] = self._measure("plan", len(matched), lambda: planner.plan(download_list, matched, Stats()))
+
+            # Execute renames and moves to trash
+            self._measure("trash_init", 0, trash.init)
+            executor: Executor = Executor(trash, 4, Journal(os.path.join(workdir, "taren.journal")))
+            self._measure("execute", len(operations), lambda: executor.execute(operations))
+            self._measure("trash_list", 0, trash.list)
+            self._measure("trash_cleanup", 0, trash.cleanup)
+
+            # Group downloads by team
+            filenames: list[str] = download_list.get_filenames()
+            grouping: Grouping = Grouping(os.path.join(workdir, "Tatort.html"), downloaddir, team_list, episode_list, filenames)
+            self._measure("grouping", len(filenames), grouping.process)
+            self._measure("grouping_unchanged", len(filenames), grouping.process)
+        finally:
+            os.chdir(currentdir)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        return {
+            "parameters": {"episodes": self._episode_count, "teams": self._team_count, "downloads": self._download_count, "seed": self._seed, "workers": self._workers},
+            "platform": platform.platform(),
+            "python": sys.version,
+            "timestamp": time.time(),
+            "results": self._results,
+        }
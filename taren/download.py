@@ -0,0 +1,66 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+import os
+
+
+class Download:
+    """
+    Downloaded file with the stat data retrieved while listing the folder
+    """
+
+    ############################################################################
+    def __init__(self: object, folder: str, filename: str, size: int, mtime: float) -> None:
+        """
+        Init of variables
+        """
+        self.folder: str = folder
+        self.filename: str = filename
+        self.size: int = size
+        self.mtime: float = mtime
+
+    ############################################################################
+    def __repr__(self: object) -> str:
+        """
+        Default string representation of a download
+        """
+        return self.get_fqn()
+
+    ############################################################################
+    @staticmethod
+    def from_direntry(folder: str, entry: os.DirEntry) -> "Download":
+        """
+        Create download from directory entry, on Windows without extra syscall
+        """
+        stat: os.stat_result = entry.stat()
+        return Download(folder, entry.name, stat.st_size, stat.st_mtime)
+
+    ############################################################################
+    def get_fqn(self: object) -> str:
+        """
+        Fully qualified name of download
+        """
+        return os.path.join(self.folder, self.filename)
@@ -28,37 +28,179 @@ import logging
 import fnmatch
 import os
 
+from taren.download import Download
+
 
 class DownloadList:
     """
-    Build list of filenames
+    Build list of filenames. The folder is listed once, stat data of the
+    downloads is cached and kept up to date with renames and removals.
     """
 
     ############################################################################
-    def __init__(self: object, searchdir: str, pattern: str, extension: str) -> None:
+    def __init__(self: object, searchdir: str, pattern: str, extension: str, recursive: bool = False, excludes: list[str] = None) -> None:
         """
         Init of variables
         """
         self._searchdir: str = searchdir
         self._pattern: str = pattern
         self._extension: str = extension
+        self._recursive: bool = recursive
+        self._excludes: set[str] = set([self._normalize(exclude) for exclude in excludes or []])
         # Ensure extenstion starts with a dot
         if not self._extension.startswith("."):
             self._extension = ".{}".format(self._extension)
-        logging.debug("searchdir [{}]".format(self._searchdir))
-        logging.debug("pattern [{}]".format(self._pattern))
-        logging.debug("extension [{}]".format(self._extension))
+        # Downloads by normalized FQN
+        self._downloads: dict[str, Download] = {}
+        # Names of all files by normalized folder
+        self._files: dict[str, set[str]] = {}
+        # Number of syscalls by name
+        self._syscalls: dict[str, int] = {}
+        logging.debug("searchdir [%s]", self._searchdir)
+        logging.debug("pattern [%s]", self._pattern)
+        logging.debug("extension [%s]", self._extension)
+        logging.debug("recursive [%s]", self._recursive)
+        logging.debug("excludes [%s]", self._excludes)
+
+    ############################################################################
+    def _get_searchpattern(self: object) -> str:
+        """
+        Create search pattern
+        """
+        return "*{}*{}".format(self._pattern, self._extension)
+
+    ############################################################################
+    @staticmethod
+    def _normalize(path: str) -> str:
+        """
+        Normalized path, used as key for lookups
+        """
+        return os.path.normcase(os.path.abspath(path))
+
+    ############################################################################
+    def _count(self: object, name: str, count: int = 1) -> None:
+        """
+        Count syscall
+        """
+        self._syscalls[name] = self._syscalls.get(name, 0) + count
+
+    ############################################################################
+    def _scan(self: object, folder: str) -> None:
+        """
+        List folder with scandir, remember all filenames and stat affected downloads
+        """
+        searchpattern: str = self._get_searchpattern()
+        subfolders: list[str] = []
+        files: set[str] = set()
+        self._count("scandir")
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    subfolders.append(entry.path)
+                    continue
+                files.add(os.path.normcase(entry.name))
+                if fnmatch.fnmatch(entry.name, searchpattern):
+                    download: Download = Download.from_direntry(folder, entry)
+                    self._count("stat")
+                    self._downloads[self._normalize(download.get_fqn())] = download
+        self._files[self._normalize(folder)] = files
+        if not self._recursive:
+            return
+        for subfolder in sorted(subfolders):
+            if self._normalize(subfolder) in self._excludes:
+                continue
+            self._scan(subfolder)
+
+    ############################################################################
+    def exists(self: object, fqn: str) -> bool:
+        """
+        Check existence of file using the listing, without a syscall for listed folders
+        """
+        files: set[str] = self._files.get(self._normalize(os.path.dirname(fqn)))
+        if files is None:
+            self._count("stat")
+            return os.path.exists(fqn)
+        return os.path.normcase(os.path.basename(fqn)) in files
+
+    ############################################################################
+    def get_downloads(self: object) -> list[Download]:
+        """
+        Retrieve list of affected downloads with stat data, list folder on first call
+        """
+        if 0 == len(self._files):
+            self._scan(self._searchdir)
+            # Log info about found files
+            logging.info("total number of downloads [{}]".format(len(self._downloads)))
+        downloads: list[Download] = list(self._downloads.values())
+        downloads.sort(key=lambda download: self._get_relative_name(download))
+        return downloads
+
+    ############################################################################
+    def _get_relative_name(self: object, download: Download) -> str:
+        """
+        Name of download relative to search folder
+        """
+        if self._normalize(download.folder) == self._normalize(self._searchdir):
+            return download.filename
+        return os.path.relpath(download.get_fqn(), self._searchdir)
 
     ############################################################################
     def get_filenames(self: object) -> list[str]:
         """
-        Retrieve list of affected downloads
+        Retrieve list of affected downloads, relative to search folder
+        """
+        return [self._get_relative_name(download) for download in self.get_downloads()]
+
+    ############################################################################
+    def get_syscalls(self: object) -> dict[str, int]:
+        """
+        Number of syscalls by name since last call, counter is reset
+        """
+        syscalls: dict[str, int] = self._syscalls
+        self._syscalls = {}
+        return syscalls
+
+    ############################################################################
+    def get_size(self: object, fqn: str) -> int:
+        """
+        Size of file, taken from listing if possible
+        """
+        download: Download = self._downloads.get(self._normalize(fqn))
+        if download is None:
+            self._count("stat")
+            return os.stat(fqn).st_size
+        return download.size
+
+    ############################################################################
+    def matches(self: object, filename: str) -> bool:
+        """
+        Check if filename is an affected download
+        """
+        return fnmatch.fnmatch(filename, self._get_searchpattern())
+
+    ############################################################################
+    def removed(self: object, fqn: str) -> None:
+        """
+        Update listing after file was removed, e.g. moved to trash
+        """
+        self._downloads.pop(self._normalize(fqn), None)
+        files: set[str] = self._files.get(self._normalize(os.path.dirname(fqn)))
+        if files is not None:
+            files.discard(os.path.normcase(os.path.basename(fqn)))
+
+    ############################################################################
+    def renamed(self: object, old_fqn: str, new_fqn: str) -> None:
+        """
+        Update listing after file was renamed, stat data stays the same
         """
-        # Create search pattern
-        searchpattern: str = "*{}*{}".format(self._pattern, self._extension)
-        # Apply search pattern on search
-        files: list[str] = fnmatch.filter(os.listdir(self._searchdir), searchpattern)
-        files.sort()
-        # Log info about found files
-        logging.info("total number of downloads [{}]".format(len(files)))
-        return files
+        download: Download = self._downloads.get(self._normalize(old_fqn))
+        self.removed(old_fqn)
+        files: set[str] = self._files.get(self._normalize(os.path.dirname(new_fqn)))
+        if files is not None:
+            files.add(os.path.normcase(os.path.basename(new_fqn)))
+        filename: str = os.path.basename(new_fqn)
+        if download is not None and self.matches(filename):
+            folder: str = download.folder
+            if self._normalize(folder) != self._normalize(os.path.dirname(new_fqn)):
+                folder = os.path.dirname(new_fqn)
+            self._downloads[self._normalize(new_fqn)] = Download(folder, filename, download.size, download.mtime)
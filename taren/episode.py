@@ -26,6 +26,7 @@ SOFTWARE.
 
 import logging
 import re
+import sys
 from typing import Match
 
 
@@ -38,11 +39,15 @@ class Episode:
     # Invalid characters inside filenames on Windows
     _invalid_characters: list[str] = ['"', "*", "<", ">", "?", "\\", "|", "/", ":"]
 
+    # Compact storage without per instance dictionary
+    __slots__ = ("empty", "episode_broadcast", "episode_id", "episode_inspectors", "episode_name", "episode_sequence", "episode_url", "episode_year", "_canonical")
+
     ############################################################################
     def __init__(self: object) -> None:
         """
         Default is an empty episode for __repr__ method
         """
+        self._canonical: str = None
         self.empty: bool = True
         self.episode_broadcast: str = ""
         self.episode_id: int = 0
@@ -58,17 +63,40 @@ class Episode:
         Used for sorting
         """
         if isinstance(other, Episode):
-            return self.__repr__() > other.__repr__()
+            return self.get_sort_key() > other.get_sort_key()
+        raise Exception("Cannot compare Episode to Not-A-Episode")
+
+    ############################################################################
+    def __lt__(self: object, other: object) -> bool:
+        """
+        Used for sorting
+        """
+        if isinstance(other, Episode):
+            return self.get_sort_key() < other.get_sort_key()
         raise Exception("Cannot compare Episode to Not-A-Episode")
 
     ############################################################################
     def __repr__(self: object) -> str:
         """
-        Default string representation of an episode
+        Default string representation of an episode, cached for parsed episodes
         """
+        if self._canonical is not None:
+            return self._canonical
         measstring: str = "Tatort - {:04d} - {} - {} - {} - {} - {}".format(self.episode_id, self.episode_name, self.episode_inspectors, self.episode_sequence, self.episode_broadcast, self.episode_year)
         return measstring
 
+    ############################################################################
+    def _finish(self: object) -> None:
+        """
+        Share repeated strings between episodes and cache canonical filename,
+        called once the episode data is complete
+        """
+        self.episode_broadcast = sys.intern(self.episode_broadcast)
+        self.episode_inspectors = sys.intern(self.episode_inspectors)
+        self.episode_sequence = sys.intern(self.episode_sequence)
+        self._canonical = None
+        self._canonical = self.__repr__()
+
     ############################################################################
     def _strip_invalid_characters(self: object) -> None:
         """
@@ -80,6 +108,40 @@ class Episode:
             self.episode_name = self.episode_name.replace(current_invalid_character, " ").strip()
             self.episode_sequence = self.episode_sequence.replace(current_invalid_character, "-").strip()
 
+    ############################################################################
+    @staticmethod
+    def from_record(record: tuple) -> "Episode":
+        """
+        Create episode from compact record, see get_record
+        """
+        episode: Episode = Episode()
+        (
+            episode.episode_id,
+            episode.episode_name,
+            episode.episode_inspectors,
+            episode.episode_sequence,
+            episode.episode_broadcast,
+            episode.episode_year,
+            episode.episode_url,
+        ) = record
+        episode.empty = False
+        episode._finish()
+        return episode
+
+    ############################################################################
+    def get_record(self: object) -> tuple:
+        """
+        Compact record of episode data, used for snapshots
+        """
+        return (self.episode_id, self.episode_name, self.episode_inspectors, self.episode_sequence, self.episode_broadcast, self.episode_year, self.episode_url)
+
+    ############################################################################
+    def get_sort_key(self: object) -> str:
+        """
+        Episodes are sorted by their string representation
+        """
+        return self.__repr__()
+
     ############################################################################
     def matches(self: object, filename: str) -> bool:
         """
@@ -141,3 +203,4 @@ class Episode:
         self._strip_invalid_characters()
         # Mark as not empty
         self.empty = False
+        self._finish()
@@ -0,0 +1,101 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+from taren.episode import Episode
+from taren.filenameclassifier import FilenameClassifier
+from taren.filenamekey import FilenameKey
+from taren.substringautomaton import SubstringAutomaton
+
+
+class EpisodeIndex:
+    """
+    Lookup tables for a sorted list of episodes. Resolves a classified filename
+    with the same precedence as Episode.matches.
+    """
+
+    ############################################################################
+    def __init__(self: object, episodes: list[Episode]) -> None:
+        """
+        Build lookup tables, each maps to the position of the first episode
+        """
+        self._episodes: list[Episode] = episodes
+        self._by_filename: dict[str, int] = {}
+        self._by_id: dict[int, int] = {}
+        self._by_name: dict[str, int] = {}
+        self._empty_name: int = len(episodes)
+        for position, episode in enumerate(episodes):
+            self._by_filename.setdefault(str(episode), position)
+            self._by_id.setdefault(episode.episode_id, position)
+            episode_name: str = episode.episode_name.lower()
+            if "" == episode_name:
+                # Empty name is part of every filename
+                self._empty_name = min(self._empty_name, position)
+                continue
+            self._by_name.setdefault(episode_name, position)
+        self._names: SubstringAutomaton = SubstringAutomaton(list(self._by_name.keys()))
+
+    ############################################################################
+    def is_canonical(self: object, key: FilenameKey, extension: str) -> bool:
+        """
+        Check if the classified filename already is the name of its episode
+        """
+        if FilenameKey.TAREN != key.kind:
+            return False
+        position: int = self._by_id.get(key.episode_id, len(self._episodes))
+        if position == len(self._episodes):
+            return False
+        if self._by_filename.get(key.filename, position) < position:
+            # Filename equals another episode listed before
+            return False
+        return key.filename == "{}{}".format(self._episodes[position], extension)
+
+    ############################################################################
+    def find(self: object, filename: str) -> Episode:
+        """
+        Find first episode matching the filename, empty episode otherwise
+        """
+        return self.find_key(FilenameClassifier.classify(filename))
+
+    ############################################################################
+    def find_key(self: object, key: FilenameKey) -> Episode:
+        """
+        Find first episode matching the classified filename, empty episode otherwise
+        """
+        # Filename is equal to episode string representation
+        position: int = self._by_filename.get(key.filename, len(self._episodes))
+
+        if key.episode_id is not None:
+            # Filename contains an episode number
+            position = min(position, self._by_id.get(key.episode_id, len(self._episodes)))
+        else:
+            # Episode name is part of filename
+            position = min(position, self._empty_name)
+            for episode_name in self._names.find_all(key.text):
+                position = min(position, self._by_name[episode_name])
+
+        if position < len(self._episodes):
+            return self._episodes[position]
+        return Episode()
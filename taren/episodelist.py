@@ -25,11 +25,21 @@ SOFTWARE.
 """
 
 import logging
+import os
+from concurrent.futures import Executor, Future
+
+from typing import Iterable
 
 from bs4 import BeautifulSoup
 
 from taren.episode import Episode
+from taren.episodeindex import EpisodeIndex
+from taren.filenameclassifier import FilenameClassifier
+from taren.filenamekey import FilenameKey
+from taren.snapshotcache import SnapshotCache
+from taren.tableextractor import TableExtractor
 from taren.websitecache import WebSiteCache
+from taren.websitefetcher import WebSiteFetcher
 
 
 class EpisodeList:
@@ -38,29 +48,58 @@ class EpisodeList:
     """
 
     ############################################################################
-    def __init__(self: object, pattern: str, url: str, cachetime: int, useragent: str) -> None:
+    def __init__(self: object, pattern: str, url: str, cachetime: int, useragent: str, fetcher: WebSiteFetcher = None, parser: str = "stream", cachedir: str = ".", compression: str = "none", stale: bool = False, maxstale: int = None) -> None:
         self._pattern: str = pattern
         self._url: str = url
         self._cachetime: int = cachetime
         self._useragent: str = useragent
+        self._fetcher: WebSiteFetcher = fetcher
+        self._parser: str = parser
+        self._cachedir: str = cachedir
+        self._compression: str = compression
+        self._stale: bool = stale
+        self._maxstale: int = maxstale
+        # Size of the parts of the website handed out to a worker process
+        self._partsize: int = 262144
         self._episodes: list[Episode] = []
+        self._index: EpisodeIndex = EpisodeIndex(self._episodes)
+        self._hash: str = ""
         logging.debug("pattern [{}]".format(pattern))
         logging.debug("url [{}]".format(url))
         logging.debug("cachetime [{}]".format(cachetime))
         logging.debug("useragent [{}]".format(useragent))
+        logging.debug("parser [{}]".format(parser))
+        logging.debug("cachedir [{}]".format(cachedir))
 
     ############################################################################
-    def _build_list_of_episodes(self: object, raw_data: str) -> list[Episode]:
+    @staticmethod
+    def _get_rows(websitecontent: str, parser: str) -> Iterable[list[str]]:
         """
-        Extract episodes from episode list
+        Get texts of the cells of the rows of the table with episodes
+        """
+        if "bs4" == parser:
+            # Parse website using BeautifulSoup
+            websitedata: BeautifulSoup = BeautifulSoup(websitecontent, "html.parser")
+            # Get table with episodes - there is only one tables
+            table: str = websitedata.find("table")
+            # Get texts of cells of each table row
+            rows: Iterable[list[str]] = [[i.text for i in table_row.find_all("td")] for table_row in table.find_all("tr")]
+        else:
+            # Stream rows of the first table without building a document tree
+            rows = TableExtractor.extract_rows(websitecontent)
+        return rows
+
+    ############################################################################
+    @staticmethod
+    def _parse_rows(raw_data: Iterable[list[str]]) -> list[Episode]:
+        """
+        Extract episodes from rows of the episode list, keeps order of the rows
         """
         episodes: list[Episode] = []
         # For each HTML table row aka raw episode data
-        for table_row in raw_data:
-            # Extract all columns as cell
-            table_cells: list[str] = table_row.find_all("td")
+        for table_cells in raw_data:
             # Get content of cells
-            episode_data: list[str] = [i.text.replace("\n", "") for i in table_cells]
+            episode_data: list[str] = [i.replace("\n", "") for i in table_cells]
             # Create a new and empty episode
             current_episode: Episode = Episode()
             # Parse raw data into episode object
@@ -69,23 +108,42 @@ class EpisodeList:
             if not current_episode.empty:
                 episodes.append(current_episode)
                 # logging.debug("episode [{}]".format(current_episode))
+        return episodes
+
+    ############################################################################
+    @staticmethod
+    def _parse_part(websitecontent: str, parser: str) -> list[tuple]:
+        """
+        Parse part of the website in a worker process, return the compact records
+        of the episodes, which are cheaper to pass back than the objects
+        """
+        return [episode.get_record() for episode in EpisodeList._parse_rows(EpisodeList._get_rows(websitecontent, parser))]
+
+    ############################################################################
+    def _build_list_of_episodes(self: object, raw_data: Iterable[list[str]]) -> list[Episode]:
+        """
+        Extract episodes from episode list
+        """
+        episodes: list[Episode] = EpisodeList._parse_rows(raw_data)
         # Return list of episodes
-        episodes.sort()
+        episodes.sort(key=Episode.get_sort_key)
         return episodes
 
     ############################################################################
-    def _parse_website(self: object, websitecontent: str) -> list[Episode]:
+    def _parse_website(self: object, websitecontent: str, executor: Executor = None) -> list[Episode]:
         """
-        Build internal list about episodes based on website content.
+        Build internal list about episodes based on website content. With an
+        executor the parts of the table are parsed by its worker processes.
         """
-        # Parse website using BeautifulSoup
-        websitedata: BeautifulSoup = BeautifulSoup(websitecontent, "html.parser")
-        # Get table with episodes - there is only one tables
-        table: str = websitedata.find("table")
-        # Get raw episode data from table data row
-        rows: list[str] = table.find_all("tr")
-        # Build list of episodes for all rows
-        episodes: list[Episode] = self._build_list_of_episodes(rows)
+        if executor is None:
+            return self._build_list_of_episodes(EpisodeList._get_rows(websitecontent, self._parser))
+        # Only the table of the streaming parser can be split, results are merged in order of the parts
+        parts: list[str] = [websitecontent]
+        if "stream" == self._parser:
+            parts = TableExtractor.split_rows(websitecontent, self._partsize)
+        futures: list[Future] = [executor.submit(EpisodeList._parse_part, part, self._parser) for part in parts]
+        episodes: list[Episode] = [Episode.from_record(record) for future in futures for record in future.result()]
+        episodes.sort(key=Episode.get_sort_key)
         return episodes
 
     ############################################################################
@@ -94,23 +152,15 @@ class EpisodeList:
         Retrieve website via cache
         """
         # Get website content from cache handler
-        cache: WebSiteCache = WebSiteCache(self._pattern, self._url, self._cachetime, self._useragent)
-        return cache.get_website_from_cache()
+        return self.get_cache().get_website_from_cache()
 
     ############################################################################
     def find_episode(self: object, filename: str) -> Episode:
         """
         Find episode in list
         """
-        # Create empty episode
-        episode: Episode = Episode()
-        # Loop over all episodes
-        for current_episode in self._episodes:
-            # Does filename match episode
-            if current_episode.matches(filename):
-                # Memorize episode and abort loop
-                episode = current_episode
-                break
+        # Lookup filename in index of episodes
+        episode: Episode = self._index.find(filename)
 
         # Check episode for logging data
         # if episode.empty:
@@ -121,17 +171,72 @@ class EpisodeList:
         # Return either empty episode or found episode
         return episode
 
+    ############################################################################
+    def find_episodes(self: object, filenames: list[str]) -> list[Episode]:
+        """
+        Find episodes of all filenames in one pass
+        """
+        return self.find_episodes_by_keys(FilenameClassifier.classify_all(filenames))
+
+    ############################################################################
+    def get_hash(self: object) -> str:
+        """
+        Hash of the website content the episodes are parsed from
+        """
+        return self._hash
+
+    ############################################################################
+    def is_canonical(self: object, key: FilenameKey, extension: str) -> bool:
+        """
+        Check if the classified filename is already named like its episode
+        """
+        return self._index.is_canonical(key, extension)
+
+    ############################################################################
+    def find_episode_by_key(self: object, key: FilenameKey) -> Episode:
+        """
+        Find episode of an already classified filename
+        """
+        return self._index.find_key(key)
+
+    ############################################################################
+    def find_episodes_by_keys(self: object, keys: list[FilenameKey]) -> list[Episode]:
+        """
+        Find episodes of already classified filenames
+        """
+        return [self._index.find_key(key) for key in keys]
+
     ############################################################################
     def get_episode_count(self: object) -> int:
         return len(self._episodes)
 
     ############################################################################
-    def get_episodes(self: object) -> None:
+    def get_cache(self: object) -> WebSiteCache:
+        """
+        Cache handler of website, e.g. to prefetch the content
+        """
+        return WebSiteCache(self._pattern, self._url, self._cachetime, self._useragent, self._fetcher, self._cachedir, self._compression, self._stale, self._maxstale)
+
+    ############################################################################
+    def get_episodes(self: object, websitecontent: str = None, executor: Executor = None) -> None:
         """
-        Read website and extract episodes, return them as list.
+        Read website, unless the content was already prefetched, and extract episodes, return them as list.
+        Parts of the website are parsed by the worker processes of the executor when given.
         """
         # Get website content
-        websitecontent: str = self._read_website()
-        # Parse website
-        self._episodes = self._parse_website(websitecontent)
+        if websitecontent is None:
+            websitecontent = self._read_website()
+        # Use snapshot of parsed episodes when website content is unchanged
+        snapshot: SnapshotCache = SnapshotCache(os.path.join(self._cachedir, self._pattern))
+        contenthash: str = SnapshotCache.get_hash(websitecontent)
+        self._hash = contenthash
+        records: list[tuple] = snapshot.load(contenthash)
+        if records is None:
+            # Parse website
+            self._episodes = self._parse_website(websitecontent, executor)
+            snapshot.save(contenthash, [episode.get_record() for episode in self._episodes])
+        else:
+            self._episodes = [Episode.from_record(record) for record in records]
+        # Build index for matching downloads
+        self._index = EpisodeIndex(self._episodes)
         logging.info("total number of episodes [{}]".format(len(self._episodes)))
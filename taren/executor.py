@@ -0,0 +1,191 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from taren.journal import Journal
+from taren.operation import Operation
+from taren.trash import Trash
+
+
+class Executor:
+    """
+    Execute planned operations on a bounded thread pool. Operations touching
+    the same file are executed in planned order, every step is written to the
+    journal.
+    """
+
+    ############################################################################
+    def __init__(self: object, trash: Trash, workers: int, journal: Journal) -> None:
+        """
+        Default init of variables
+        """
+        self._trash: Trash = trash
+        self._workers: int = max(1, workers)
+        self._journal: Journal = journal
+        logging.debug("workers [{}]".format(self._workers))
+
+    ############################################################################
+    @staticmethod
+    def _get_paths(operation: Operation) -> list[str]:
+        """
+        Normalized paths touched by an operation
+        """
+        paths: list[str] = [operation.source]
+        if Operation.RENAME == operation.kind:
+            paths.append(operation.destination)
+        return [os.path.normcase(os.path.abspath(path)) for path in paths]
+
+    ############################################################################
+    def _build_chains(self: object, operations: list[Operation]) -> list[list[Operation]]:
+        """
+        Group operations sharing a file into chains, each chain keeps planned order
+        """
+        parent: dict[str, str] = {}
+
+        def find(path: str) -> str:
+            parent.setdefault(path, path)
+            while parent[path] != path:
+                parent[path] = parent[parent[path]]
+                path = parent[path]
+            return path
+
+        for operation in operations:
+            paths: list[str] = Executor._get_paths(operation)
+            for path in paths[1:]:
+                parent[find(path)] = find(paths[0])
+
+        chains: dict[str, list[Operation]] = {}
+        for operation in operations:
+            chains.setdefault(find(Executor._get_paths(operation)[0]), []).append(operation)
+        return list(chains.values())
+
+    ############################################################################
+    def _execute_operation(self: object, operation: Operation) -> None:
+        """
+        Perform a single operation
+        """
+        if Operation.RENAME == operation.kind:
+            logging.info("rename from [%s] to [%s] filename", operation.source, operation.destination)
+            os.rename(operation.source, operation.destination)
+        else:
+            operation.destination = self._trash.move(operation.source)
+
+    ############################################################################
+    def _execute_chain(self: object, chain: list[Operation]) -> int:
+        """
+        Perform operations of chain in order, abort chain on first failure.
+        Return number of failed operations.
+        """
+        for index, operation in enumerate(chain):
+            try:
+                self._execute_operation(operation)
+            except OSError as exception:
+                logging.error("operation [%s] failed [%s], skip [%d] dependent operations", operation, exception, len(chain) - index - 1)
+                self._journal.write([operation], Journal.FAILED)
+                return len(chain) - index
+            self._journal.write([operation], Journal.DONE)
+        return 0
+
+    ############################################################################
+    def execute(self: object, operations: list[Operation]) -> int:
+        """
+        Execute planned operations, return number of failed operations
+        """
+        if 0 == len(operations):
+            return 0
+        for sequence, operation in enumerate(operations):
+            operation.sequence = sequence
+        self._journal.write(operations, Journal.PLANNED)
+        chains: list[list[Operation]] = self._build_chains(operations)
+        logging.info("execute [{}] operations in [{}] chains with [{}] workers".format(len(operations), len(chains), self._workers))
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            failed: int = sum(executor.map(self._execute_chain, chains))
+        # Run is complete, journal is only required for interrupted runs
+        self._journal.clear()
+        return failed
+
+    ############################################################################
+    def recover(self: object, mode: str) -> None:
+        """
+        Handle journal of an interrupted run, either resume or roll back
+        """
+        if not self._journal.exists():
+            return
+        operations, states = self._journal.read()
+        logging.warning("found journal of interrupted run with [{}] operations, [{}]".format(len(operations), mode))
+        if "rollback" == mode:
+            self._rollback([operation for operation in operations if Journal.DONE == states[operation.sequence]])
+        else:
+            for chain in self._build_chains(operations):
+                self._resume_chain(chain, states)
+        self._journal.clear()
+
+    ############################################################################
+    def _resume_chain(self: object, chain: list[Operation], states: dict[int, str]) -> None:
+        """
+        Perform outstanding operations of chain in planned order, abort chain
+        on first failure like during execution
+        """
+        for index, operation in enumerate(chain):
+            state: str = states[operation.sequence]
+            if Journal.DONE == state:
+                continue
+            if Journal.PLANNED == state:
+                if not os.path.exists(operation.source):
+                    # Operation was performed, but not written to journal
+                    logging.warning("source of [%s] is gone, skip operation", operation)
+                    continue
+                try:
+                    self._execute_operation(operation)
+                    self._journal.write([operation], Journal.DONE)
+                    continue
+                except OSError as exception:
+                    logging.error("operation [%s] failed [%s]", operation, exception)
+                    self._journal.write([operation], Journal.FAILED)
+            # Operation failed, remaining operations of chain depend on it
+            dependent: list[Operation] = [entry for entry in chain[index + 1 :] if Journal.PLANNED == states[entry.sequence]]
+            if dependent:
+                logging.error("operation [%s] failed, skip [%d] dependent operations", operation, len(dependent))
+                self._journal.write(dependent, Journal.FAILED)
+            return
+
+    ############################################################################
+    def _rollback(self: object, operations: list[Operation]) -> None:
+        """
+        Undo performed operations in reverse order
+        """
+        for operation in reversed(operations):
+            if not operation.destination or not os.path.exists(operation.destination) or os.path.exists(operation.source):
+                logging.warning("cannot roll back [%s]", operation)
+                continue
+            logging.info("roll back [%s]", operation)
+            try:
+                os.rename(operation.destination, operation.source)
+            except OSError as exception:
+                logging.error("roll back of [%s] failed [%s]", operation, exception)
@@ -0,0 +1,71 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+import re
+from typing import Match
+
+from taren.filenamekey import FilenameKey
+
+
+class FilenameClassifier:
+    """
+    Classify download filenames once with precompiled patterns. The checks are
+    done in the order of Episode.matches, the first pattern found wins.
+    """
+
+    # Leading episode number => download marked as special episode manually
+    _regex_explicit: re.Pattern = re.compile(r"([0-9]{4}) ")
+    # Download of dailymotion
+    _regex_dailymotion: re.Pattern = re.compile(r"_E([0-9]{3,4})_")
+    # Episode prefix with number => already handled by TaRen
+    _regex_taren: re.Pattern = re.compile(r"Tatort - ([0-9]{4}) ")
+
+    ############################################################################
+    @staticmethod
+    def classify(filename: str) -> FilenameKey:
+        """
+        Extract typed key from a single filename
+        """
+        # Both anchored patterns only need to check the start of the filename
+        filename_match: Match[str] = FilenameClassifier._regex_explicit.match(filename)
+        if filename_match:
+            return FilenameKey(filename, FilenameKey.EXPLICIT, int(filename_match.group(1)))
+        filename_match = FilenameClassifier._regex_dailymotion.search(filename)
+        if filename_match:
+            return FilenameKey(filename, FilenameKey.DAILYMOTION, int(filename_match.group(1)))
+        filename_match = FilenameClassifier._regex_taren.match(filename)
+        if filename_match:
+            return FilenameKey(filename, FilenameKey.TAREN, int(filename_match.group(1)))
+        return FilenameKey(filename, FilenameKey.TEXT, None, filename.lower())
+
+    ############################################################################
+    @staticmethod
+    def classify_all(filenames: list[str]) -> list[FilenameKey]:
+        """
+        Extract typed keys from a batch of filenames, e.g. the whole download list
+        """
+        classify = FilenameClassifier.classify
+        return [classify(filename) for filename in filenames]
@@ -0,0 +1,60 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+
+class FilenameKey:
+    """
+    Result of classifying a download filename: the kind of key found in the
+    filename and the episode number or the lowercased text to search in
+    """
+
+    # Leading episode number => download marked as special episode manually
+    EXPLICIT: str = "explicit"
+    # Episode number of a download of dailymotion
+    DAILYMOTION: str = "dailymotion"
+    # Episode prefix with number => already handled by TaRen
+    TAREN: str = "taren"
+    # No episode number, episode name has to be part of the text
+    TEXT: str = "text"
+
+    __slots__ = ("filename", "kind", "episode_id", "text")
+
+    ############################################################################
+    def __init__(self: object, filename: str, kind: str, episode_id: int = None, text: str = "") -> None:
+        """
+        Default init of variables
+        """
+        self.filename: str = filename
+        self.kind: str = kind
+        self.episode_id: int = episode_id
+        self.text: str = text
+
+    ############################################################################
+    def __repr__(self: object) -> str:
+        """
+        Default string representation of a key
+        """
+        return "{} [{}] [{}]".format(self.kind, self.episode_id, self.filename)
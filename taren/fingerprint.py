@@ -0,0 +1,166 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import pickle
+
+from taren.download import Download
+
+
+class Fingerprint:
+    """
+    Content fingerprint of downloads. Only samples at the head, the middle and
+    the tail of a file are hashed, so a few MB are read even for large files.
+    Fingerprints are cached by inode, size and modification time, only those
+    used by the current run are saved again.
+    """
+
+    # Increase when the way of hashing changes
+    _version: int = 1
+    # Size of each sample
+    _chunksize: int = 1024 * 1024
+
+    ############################################################################
+    def __init__(self: object, cachename: str) -> None:
+        """
+        Default init of variables
+        """
+        self._cachename: str = cachename
+        self._cache: dict[tuple[int, int, int], str] = {}
+        # Keys used by this run and number of entries in the file
+        self._used: set[tuple[int, int, int]] = set()
+        self._stored: int = 0
+        self._changed: bool = False
+        self._loaded: bool = False
+        logging.debug("fingerprint file [{}]".format(self._cachename))
+
+    ############################################################################
+    def _load(self: object) -> None:
+        """
+        Read cached fingerprints once, ignore missing or outdated cache
+        """
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self._cachename):
+            return
+        try:
+            with open(self._cachename, "rb") as file:
+                version, cache = pickle.load(file)
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+            logging.warning("fingerprint file [{}] is unreadable, ignore it".format(self._cachename))
+            return
+        if version != Fingerprint._version:
+            logging.info("fingerprint file [{}] is outdated".format(self._cachename))
+            return
+        self._cache = cache
+        self._stored = len(cache)
+        logging.info("read [{}] fingerprints from file [{}]".format(len(self._cache), self._cachename))
+
+    ############################################################################
+    def save(self: object) -> None:
+        """
+        Write fingerprints used by this run if new ones were calculated or
+        entries of files renamed, trashed or deleted since have to be dropped
+        """
+        if not self._changed and len(self._used) == self._stored:
+            return
+        cache: dict[tuple[int, int, int], str] = {key: self._cache[key] for key in self._used}
+        tempname: str = "{}.tmp".format(self._cachename)
+        try:
+            with open(tempname, "wb") as file:
+                pickle.dump((Fingerprint._version, cache), file, pickle.HIGHEST_PROTOCOL)
+            os.replace(tempname, self._cachename)
+        except OSError:
+            logging.warning("cannot write fingerprint file [{}]".format(self._cachename))
+            return
+        self._changed = False
+        self._stored = len(cache)
+        logging.info("saved [{}] fingerprints to file [{}]".format(len(cache), self._cachename))
+
+    ############################################################################
+    @staticmethod
+    def _hash_file(fqn: str, size: int) -> str:
+        """
+        Hash samples of file using a memory map, small files are hashed completely
+        """
+        filehash = hashlib.blake2b(str(size).encode("utf-8"), digest_size=16)
+        if 0 == size:
+            return filehash.hexdigest()
+        chunksize: int = Fingerprint._chunksize
+        with open(fqn, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            if size <= 3 * chunksize:
+                filehash.update(content)
+                return filehash.hexdigest()
+            middle: int = (size - chunksize) // 2
+            for offset in [0, middle, size - chunksize]:
+                filehash.update(content[offset : offset + chunksize])
+        return filehash.hexdigest()
+
+    ############################################################################
+    def get(self: object, fqn: str) -> str:
+        """
+        Fingerprint of file, None if file cannot be read
+        """
+        self._load()
+        try:
+            stat: os.stat_result = os.stat(fqn)
+            key: tuple[int, int, int] = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            fingerprint: str = self._cache.get(key)
+            if fingerprint is None:
+                fingerprint = self._hash_file(fqn, stat.st_size)
+                self._cache[key] = fingerprint
+                self._changed = True
+            self._used.add(key)
+        except (OSError, ValueError):
+            logging.warning("cannot fingerprint file [%s]", fqn)
+            return None
+        return fingerprint
+
+    ############################################################################
+    def find_duplicates(self: object, downloads: list[Download]) -> list[list[str]]:
+        """
+        Group downloads with equal content, only files of equal size are hashed
+        """
+        by_size: dict[int, list[Download]] = {}
+        for download in downloads:
+            by_size.setdefault(download.size, []).append(download)
+
+        duplicates: list[list[str]] = []
+        for candidates in by_size.values():
+            if 2 > len(candidates):
+                continue
+            by_fingerprint: dict[str, list[str]] = {}
+            for download in candidates:
+                fingerprint: str = self.get(download.get_fqn())
+                if fingerprint is None:
+                    continue
+                by_fingerprint.setdefault(fingerprint, []).append(download.get_fqn())
+            duplicates.extend([group for group in by_fingerprint.values() if 1 < len(group)])
+        return duplicates
@@ -24,60 +24,147 @@ SOFTWARE.
 ******************************************************************************
 """
 
+import codecs
+import html
+import json
 import logging
 import os
+from pathlib import Path
 
-from taren.downloadlist import DownloadList
 from taren.episode import Episode
 from taren.episodelist import EpisodeList
-from taren.helper import Helper
-from taren.tarenconfig import TarenConfig
+from taren.filenameclassifier import FilenameClassifier
+from taren.filenamekey import FilenameKey
+from taren.statedb import StateDB
 from taren.team import Team
 from taren.teamlist import TeamList
 
 
 class Grouping:
     """
-    Group specified episodes by given data
+    Group specified episodes by given data. The HTML document is streamed to
+    the playlist file, a manifest of the groups allows to reuse the sections of
+    unchanged groups on the next run.
     """
 
+    # Increase when the layout of the document changes
+    _version: int = 1
+
     ############################################################################
-    def __init__(self: object, config: TarenConfig, teams: TeamList, episodes: EpisodeList, downloads: list[str]) -> None:
-        self._config: TarenConfig = config
+    def __init__(self: object, playlist: str, downloaddir: str, teams: TeamList, episodes: EpisodeList, downloads: list[str], state: StateDB = None) -> None:
+        self._playlist: str = playlist
+        self._manifest: str = "{}.manifest".format(playlist)
+        self._downloaddir: str = downloaddir
         self._teams: TeamList = teams
         self._episodes: EpisodeList = episodes
-        self._downloads: DownloadList = downloads
+        self._state: StateDB = state
+        self._downloads: list[str] = downloads
 
     ############################################################################
-    def _buildDocument(self: object, outputFile: str, documentData: dict) -> None:
-        with open(outputFile, "w") as groupfile:
-            groupfile.write("<html>\n")
-            groupfile.write("<head>\n")
-            groupfile.write("   <title>TaRen Groups</title>\n")
-            groupfile.write("</head>\n")
-            groupfile.write("<body>\n")
-            for group in documentData:
-                groupfile.write("   <h2>{}</h2>\n".format(group))
-                for episode in documentData[group]:
-                    episodepath: str = os.path.join(self._config.taren_downloads, episode)
-                    groupfile.write('   <a href="file:///{}">{}</a><br>\n'.format(episodepath, episode))
-                groupfile.write("   <p>")
-            groupfile.write("</body>\n")
-            groupfile.write("</html>\n")
+    def _build_section(self: object, group: str, entries: list[list]) -> str:
+        """
+        HTML section of one group
+        """
+        lines: list[str] = ["   <h2>{}</h2>\n".format(html.escape(group))]
+        for download, _, _ in entries:
+            episodeuri: str = Path(os.path.abspath(os.path.join(self._downloaddir, download))).as_uri()
+            lines.append('   <a href="{}">{}</a><br>\n'.format(html.escape(episodeuri), html.escape(download)))
+        lines.append("   <p>\n")
+        return "".join(lines)
 
     ############################################################################
-    def process(self: object) -> None:
-        for currentDownload in self._downloads:
-            logging.debug("-" * 80)
-            episode: Episode = self._episodes.find_episode(currentDownload)
+    def _buildDocument(self: object, outputFile: str, sections: list[str]) -> None:
+        """
+        Stream sections through a buffered writer, replace document atomically
+        """
+        tempfile: str = "{}.tmp".format(outputFile)
+        with codecs.open(tempfile, "w", "utf-8", buffering=65536) as groupfile:
+            groupfile.write("<html>\n<head>\n   <title>TaRen Groups</title>\n</head>\n<body>\n")
+            groupfile.writelines(sections)
+            groupfile.write("</body>\n</html>\n")
+        os.replace(tempfile, outputFile)
+
+    ############################################################################
+    def _group(self: object) -> dict[str, list[list]]:
+        """
+        Resolve episodes and teams of all downloads with batched lookups and
+        group the tuples (download, episode, team) by team
+        """
+        keys: list[FilenameKey] = FilenameClassifier.classify_all([os.path.basename(download) for download in self._downloads])
+        episodes: list[Episode] = self._episodes.find_episodes_by_keys(keys)
+        matched: list[tuple[str, Episode]] = []
+        for currentDownload, episode in zip(self._downloads, episodes):
             if episode.empty:
-                logging.error("No episode found for [{}]".format(currentDownload))
+                logging.error("No episode found for [%s]", currentDownload)
                 continue
-            team: Team = self._teams.find_team(episode)
+            matched.append((currentDownload, episode))
+        teams: list[Team] = self._teams.find_teams([episode for _, episode in matched])
+
+        groups: dict[str, list[list]] = {}
+        for (currentDownload, episode), team in zip(matched, teams):
             if team.empty:
-                logging.error("No team found for [{}]".format(episode))
+                logging.error("No team found for [%s]", episode)
+                continue
+            groups.setdefault(str(team), []).append([currentDownload, episode.episode_id, str(team)])
+
+        # Remember team of each download
+        if self._state is not None:
+            self._state.set_teams([(os.path.join(self._downloaddir, entry[0]), entry[2]) for entries in groups.values() for entry in entries])
+        return groups
+
+    ############################################################################
+    def _read_manifest(self: object) -> dict:
+        """
+        Read groups and sections of the last run
+        """
+        if not os.path.exists(self._manifest) or not os.path.exists(self._playlist):
+            return {}
+        try:
+            with codecs.open(self._manifest, "r", "utf-8") as file:
+                manifest: dict = json.load(file)
+        except (OSError, ValueError):
+            logging.warning("cannot read manifest [{}], ignore it".format(self._manifest))
+            return {}
+        if manifest.get("version") != Grouping._version or manifest.get("downloaddir") != self._downloaddir:
+            return {}
+        return manifest.get("groups", {})
+
+    ############################################################################
+    def _write_manifest(self: object, groups: dict[str, dict]) -> None:
+        """
+        Write groups and sections for the next run
+        """
+        with codecs.open(self._manifest, "w", "utf-8") as file:
+            json.dump({"version": Grouping._version, "downloaddir": self._downloaddir, "groups": groups}, file)
+
+    ############################################################################
+    def process(self: object) -> None:
+        """
+        Write document with downloads grouped by team, only sections of changed
+        groups are rendered again. Nothing is written when no group changed.
+        """
+        groups: dict[str, list[list]] = self._group()
+        previous: dict[str, dict] = self._read_manifest()
+
+        current: dict[str, dict] = {}
+        changed: int = 0
+        for group in sorted(groups):
+            entries: list[list] = groups[group]
+            if group in previous and previous[group]["entries"] == entries:
+                current[group] = previous[group]
                 continue
+            current[group] = {"entries": entries, "section": self._build_section(group, entries)}
+            changed += 1
+
+        if 0 == changed and list(previous.keys()) == list(current.keys()):
+            logging.info("groups unchanged, keep [{}]".format(self._playlist))
+            return
 
-            logging.debug("Team [{}]".format(team))
-            logging.debug("Episode [{}]".format(episode))
-            logging.debug("Download [{}]".format(currentDownload))
+        try:
+            self._buildDocument(self._playlist, [current[group]["section"] for group in current])
+            self._write_manifest(current)
+        except OSError as error:
+            # Report is optional, the rest of the run has to complete
+            logging.error("cannot write groups to [{}]: {}".format(self._playlist, error))
+            return
+        logging.info("wrote [{}] groups to [{}], [{}] changed".format(len(current), self._playlist, changed))
@@ -25,6 +25,8 @@ SOFTWARE.
 """
 
 import logging
+import multiprocessing
+import multiprocessing.context
 import os
 
 
@@ -47,3 +49,11 @@ class Helper:
     @staticmethod
     def delete_file(filename: str) -> bool:
         os.remove(filename)
+
+    ############################################################################
+    @staticmethod
+    def get_process_context() -> multiprocessing.context.BaseContext:
+        # Worker processes are not forked from the threads of the running program
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            return multiprocessing.get_context("forkserver")
+        return multiprocessing.get_context("spawn")
@@ -0,0 +1,104 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+import codecs
+import json
+import logging
+import os
+import threading
+
+from taren.helper import Helper
+from taren.operation import Operation
+
+
+class Journal:
+    """
+    Append-only journal of planned and executed operations. Allows to resume
+    or roll back an interrupted run.
+    """
+
+    PLANNED: str = "planned"
+    DONE: str = "done"
+    FAILED: str = "failed"
+
+    ############################################################################
+    def __init__(self: object, filename: str) -> None:
+        """
+        Default init of variables
+        """
+        self._filename: str = filename
+        self._lock: threading.Lock = threading.Lock()
+        logging.debug("journal file [{}]".format(self._filename))
+
+    ############################################################################
+    def clear(self: object) -> None:
+        """
+        Remove journal after all operations are handled
+        """
+        if self.exists():
+            Helper.delete_file(self._filename)
+
+    ############################################################################
+    def exists(self: object) -> bool:
+        """
+        Check for journal of an interrupted run
+        """
+        return os.path.exists(self._filename)
+
+    ############################################################################
+    def read(self: object) -> tuple[list[Operation], dict[int, str]]:
+        """
+        Read planned operations in order and the last state of each operation.
+        An incomplete last line of a crashed run is ignored.
+        """
+        operations: dict[int, Operation] = {}
+        states: dict[int, str] = {}
+        with codecs.open(self._filename, "r", "utf-8") as file:
+            for line in file:
+                try:
+                    entry: dict = json.loads(line)
+                except ValueError:
+                    logging.warning("ignore broken journal entry [{}]".format(line.strip()))
+                    continue
+                operation: Operation = Operation.from_dict(entry)
+                if operation.sequence not in operations or operation.destination:
+                    operations[operation.sequence] = operation
+                states[operation.sequence] = entry["state"]
+        return [operations[sequence] for sequence in sorted(operations)], states
+
+    ############################################################################
+    def write(self: object, operations: list[Operation], state: str) -> None:
+        """
+        Append state of operations to journal and flush it to disk
+        """
+        with self._lock:
+            with codecs.open(self._filename, "a", "utf-8") as file:
+                for operation in operations:
+                    entry: dict = operation.to_dict()
+                    entry["state"] = state
+                    file.write("{}\n".format(json.dumps(entry)))
+                file.flush()
+                os.fsync(file.fileno())
@@ -0,0 +1,70 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+
+class Operation:
+    """
+    Planned filesystem operation on a download: either rename the download
+    or move it to the trash
+    """
+
+    RENAME: str = "rename"
+    TRASH: str = "trash"
+
+    ############################################################################
+    def __init__(self: object, kind: str, source: str, destination: str = "") -> None:
+        """
+        Default init of variables, destination of a move to trash is known
+        after execution
+        """
+        self.kind: str = kind
+        self.source: str = source
+        self.destination: str = destination
+        self.sequence: int = 0
+
+    ############################################################################
+    def __repr__(self: object) -> str:
+        """
+        Default string representation of an operation
+        """
+        return "{} [{}] => [{}]".format(self.kind, self.source, self.destination)
+
+    ############################################################################
+    @staticmethod
+    def from_dict(data: dict) -> "Operation":
+        """
+        Create operation from journal entry
+        """
+        operation: Operation = Operation(data["kind"], data["source"], data["destination"])
+        operation.sequence = data["sequence"]
+        return operation
+
+    ############################################################################
+    def to_dict(self: object) -> dict:
+        """
+        Journal entry of operation
+        """
+        return {"sequence": self.sequence, "kind": self.kind, "source": self.source, "destination": self.destination}
@@ -0,0 +1,207 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+import logging
+import os
+import time
+
+from taren.download import Download
+from taren.downloadlist import DownloadList
+from taren.episode import Episode
+from taren.episodelist import EpisodeList
+from taren.filenameclassifier import FilenameClassifier
+from taren.filenamekey import FilenameKey
+from taren.fingerprint import Fingerprint
+from taren.operation import Operation
+from taren.stats import Stats
+
+
+class Planner:
+    """
+    Planning phase of renaming: match downloads against episodes and decide
+    which downloads are renamed or moved to trash. Nothing is touched on disk.
+    """
+
+    ############################################################################
+    def __init__(self: object, episode_list: EpisodeList, extension: str, fingerprint: Fingerprint = None) -> None:
+        """
+        Default init of variables
+        """
+        self._episode_list: EpisodeList = episode_list
+        self._extension: str = extension
+        self._fingerprint: Fingerprint = fingerprint
+        # Planned state (size, mtime, episode, action) by FQN, None for removed downloads
+        self._states: dict[str, tuple[int, float, int, str]] = {}
+
+    ############################################################################
+    def _set_state(self: object, fqn: str, download: Download = None, episode_id: int = None, action: str = None) -> None:
+        """
+        Remember planned state of a download, without download it is removed
+        """
+        if download is None:
+            self._states[os.path.normcase(fqn)] = None
+            return
+        self._states[os.path.normcase(fqn)] = (download.size, download.mtime, episode_id, action)
+
+    ############################################################################
+    def get_states(self: object) -> dict[str, tuple[int, float, int, str]]:
+        """
+        Planned state of all processed downloads by FQN
+        """
+        return self._states
+
+    ############################################################################
+    def _is_duplicate(self: object, fqn: str, other_fqn: str) -> bool:
+        """
+        Compare content of two files of equal size. Without fingerprints or if
+        a file cannot be read, equal size is taken as duplicate.
+        """
+        if self._fingerprint is None:
+            return True
+        fingerprint: str = self._fingerprint.get(fqn)
+        other_fingerprint: str = self._fingerprint.get(other_fqn)
+        if fingerprint is None or other_fingerprint is None:
+            return True
+        return fingerprint == other_fingerprint
+
+    ############################################################################
+    def skip_owned(self: object, downloads: list[Download], statistics: Stats) -> tuple[list[Download], list[FilenameKey]]:
+        """
+        Count downloads already named like their episode as owned and return
+        only the remaining downloads with their keys for the full matcher
+        """
+        keys: list[FilenameKey] = FilenameClassifier.classify_all([current_download.filename for current_download in downloads])
+        remaining: list[Download] = []
+        remaining_keys: list[FilenameKey] = []
+        for current_download, key in zip(downloads, keys):
+            if self._episode_list.is_canonical(key, self._extension):
+                statistics.episodes_owned += 1
+                self._set_state(current_download.get_fqn(), current_download, key.episode_id, "owned")
+                continue
+            remaining.append(current_download)
+            remaining_keys.append(key)
+        logging.info("downloads already owned [{}]".format(len(downloads) - len(remaining)))
+        return remaining, remaining_keys
+
+    ############################################################################
+    def match(self: object, downloads: list[Download], statistics: Stats = None, keys: list[FilenameKey] = None) -> list[tuple[Download, Episode]]:
+        """
+        Find episode for each download, skip downloads without episode. With
+        statistics the latency of each lookup is recorded by kind of key. Keys
+        of the downloads are reused when already classified.
+        """
+        # Classify all filenames once and lookup episodes
+        if keys is None:
+            keys = FilenameClassifier.classify_all([current_download.filename for current_download in downloads])
+        if statistics is None:
+            episodes: list[Episode] = self._episode_list.find_episodes_by_keys(keys)
+        else:
+            episodes = []
+            for key in keys:
+                begin: float = time.perf_counter()
+                episodes.append(self._episode_list.find_episode_by_key(key))
+                statistics.observe(key.kind, time.perf_counter() - begin)
+
+        # Create list of downloads to process
+        downloads_to_process: list[tuple[Download, Episode]] = []
+        for current_download, episode in zip(downloads, episodes):
+            if episode.empty:
+                self._set_state(current_download.get_fqn(), current_download, None, "unmatched")
+                continue
+            downloads_to_process.append((current_download, episode))
+            # logging.debug("added dowload to process list: [{}]".format(current_download))
+        logging.info("downloads_to_process [{}]".format(len(downloads_to_process)))
+        return downloads_to_process
+
+    ############################################################################
+    def plan(self: object, download_list: DownloadList, downloads_to_process: list[tuple[Download, Episode]], statistics: Stats) -> list[Operation]:
+        """
+        Plan operations for matched downloads. The listing of the downloads is
+        updated to the planned result.
+        """
+        operations: list[Operation] = []
+        # Planned renames are not done yet, content is still at the source
+        sources: dict[str, str] = {}
+        for current_download, episode in downloads_to_process:
+            new_fqn: str = os.path.join(current_download.folder, "{}{}".format(episode, self._extension))
+            old_fqn: str = current_download.get_fqn()
+
+            if new_fqn == old_fqn:
+                # Already processed episode
+                # logging.debug("filenames identical, skip file [{}]".format(old_fqn))
+                statistics.episodes_owned += 1
+                self._set_state(old_fqn, current_download, episode.episode_id, "owned")
+                continue
+
+            if download_list.exists(new_fqn):
+                # New episode already exists
+                # logging.debug("file already exists [{}]".format(new_fqn))
+                size_old: int = current_download.size
+                size_new: int = download_list.get_size(new_fqn)
+
+                if size_old == size_new and not self._is_duplicate(old_fqn, sources.get(os.path.normcase(new_fqn), new_fqn)):
+                    # Same size but different content, e.g. another cut
+                    logging.warning("file size equal but content differs, keep file [%s] and [%s]", old_fqn, new_fqn)
+                    self._set_state(old_fqn, current_download, episode.episode_id, "kept")
+                    continue
+
+                if size_old == size_new:
+                    # Episode and download are equal
+                    logging.info("file size equal, move file [%s] to trash", new_fqn)
+                    # Move to trash
+                    operations.append(Operation(Operation.TRASH, new_fqn))
+                    download_list.removed(new_fqn)
+                    self._set_state(new_fqn)
+                    statistics.downloads_moved += 1
+
+                if size_old > size_new:
+                    # Episode is greater than download
+                    logging.info("one file smaller than the other one, move file [%s] to trash", new_fqn)
+                    # Move to trash
+                    operations.append(Operation(Operation.TRASH, new_fqn))
+                    download_list.removed(new_fqn)
+                    self._set_state(new_fqn)
+                    statistics.downloads_moved += 1
+
+                if size_old < size_new:
+                    # Download is greater than episode
+                    logging.info("one file smaller than the other one, move file [%s] to trash", old_fqn)
+                    # Move to trash
+                    operations.append(Operation(Operation.TRASH, old_fqn))
+                    download_list.removed(old_fqn)
+                    self._set_state(old_fqn)
+                    statistics.downloads_moved += 1
+                    continue
+
+            # Rename download to name of episode
+            operations.append(Operation(Operation.RENAME, old_fqn, new_fqn))
+            download_list.renamed(old_fqn, new_fqn)
+            self._set_state(old_fqn)
+            self._set_state(new_fqn, current_download, episode.episode_id, "renamed")
+            sources[os.path.normcase(new_fqn)] = sources.pop(os.path.normcase(old_fqn), old_fqn)
+            statistics.downloads_renamed += 1
+
+        return operations
@@ -0,0 +1,104 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+import contextlib
+import cProfile
+import logging
+import os
+import tracemalloc
+from typing import Callable, Iterator
+
+
+class Profiler:
+    """
+    Optional profiling of a run. The reports are written next to the log file:
+    cProfile data as '.prof' file, tracemalloc differences as text file with
+    the top allocations.
+    """
+
+    ############################################################################
+    def __init__(self: object, logfile: str = "", cprofile: bool = False, allocations: bool = False, top: int = 25) -> None:
+        """
+        Default init of variables, without switches nothing is profiled
+        """
+        self._basename: str = os.path.splitext(logfile)[0] or "taren"
+        self._cprofile: bool = cprofile
+        self._allocations: bool = allocations
+        self._top: int = top
+        logging.debug("profile basename [{}]".format(self._basename))
+        logging.debug("profile cprofile [{}]".format(self._cprofile))
+        logging.debug("profile allocations [{}]".format(self._allocations))
+
+    ############################################################################
+    def get_filename(self: object, name: str, extension: str) -> str:
+        """
+        Name of report file next to the log file
+        """
+        return "{}.{}{}".format(self._basename, name, extension)
+
+    ############################################################################
+    def profile(self: object, name: str, function: Callable, *args) -> object:
+        """
+        Call function, with cProfile enabled the statistics are dumped to a '.prof' file
+        """
+        if not self._cprofile:
+            return function(*args)
+        profile: cProfile.Profile = cProfile.Profile()
+        try:
+            return profile.runcall(function, *args)
+        finally:
+            filename: str = self.get_filename(name, ".prof")
+            profile.dump_stats(filename)
+            logging.info("profile of [{}] written to [{}]".format(name, filename))
+
+    ############################################################################
+    @contextlib.contextmanager
+    def trace(self: object, name: str) -> Iterator[None]:
+        """
+        Compare allocations before and after the block, the top allocations
+        are written to a text file
+        """
+        if not self._allocations:
+            yield
+            return
+        started: bool = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        before: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+        try:
+            yield
+        finally:
+            after: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if started:
+                tracemalloc.stop()
+            differences: list[tracemalloc.StatisticDiff] = after.compare_to(before, "lineno")
+            filename: str = self.get_filename(name, ".alloc.txt")
+            with open(filename, "w", encoding="utf-8") as file:
+                file.write("allocations of [{}], current [{}] bytes, peak [{}] bytes\n".format(name, current, peak))
+                for difference in differences[: self._top]:
+                    file.write("{}\n".format(difference))
+            logging.info("allocations of [{}] written to [{}]".format(name, filename))
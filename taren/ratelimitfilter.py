@@ -0,0 +1,85 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+import logging
+import threading
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limit the number of log records per call site and interval. Suppressed
+    records are counted, the count is added to the next record passed of the
+    same call site or reported on demand.
+    """
+
+    ############################################################################
+    def __init__(self: object, limit: int, interval: float = 60.0) -> None:
+        """
+        Default init of variables, a limit of zero disables the filter
+        """
+        super().__init__()
+        self._limit: int = limit
+        self._interval: float = interval
+        self._lock: threading.Lock = threading.Lock()
+        # Begin of interval, passed and suppressed records by call site
+        self._windows: dict[tuple[str, int], list] = {}
+
+    ############################################################################
+    def filter(self: object, record: logging.LogRecord) -> bool:
+        """
+        Pass record unless the limit of its call site is reached
+        """
+        if 0 >= self._limit or not getattr(record, "ratelimit", True):
+            return True
+        key: tuple[str, int] = (record.pathname, record.lineno)
+        with self._lock:
+            window: list = self._windows.get(key)
+            if window is None or record.created - window[0] >= self._interval:
+                suppressed: int = 0 if window is None else window[2]
+                self._windows[key] = [record.created, 1, 0]
+                if 0 < suppressed:
+                    # Message may be formatted already and contain a literal percent sign
+                    message: str = record.getMessage()
+                    record.msg = "%s (suppressed [%d] similar messages)"
+                    record.args = (message, suppressed)
+                return True
+            if window[1] < self._limit:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+    ############################################################################
+    def report(self: object) -> None:
+        """
+        Log number of suppressed records of all call sites not reported yet
+        """
+        with self._lock:
+            windows: dict[tuple[str, int], list] = self._windows
+            self._windows = {}
+        for (pathname, lineno), window in windows.items():
+            if 0 < window[2]:
+                logging.info("suppressed [%d] messages of [%s:%d]", window[2], pathname, lineno, extra={"ratelimit": False})
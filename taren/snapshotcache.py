@@ -0,0 +1,93 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+
+
+class SnapshotCache:
+    """
+    Binary snapshot of parsed records, stored next to the website cache. The
+    snapshot is only valid for the website content it was created from.
+    """
+
+    # Increase when the layout of the records changes
+    _version: int = 1
+
+    ############################################################################
+    def __init__(self: object, cachename: str) -> None:
+        """
+        Default init of variables
+        """
+        self._cachename: str = "{}.snapshot".format(cachename)
+        logging.debug("snapshot file [{}]".format(self._cachename))
+
+    ############################################################################
+    @staticmethod
+    def get_hash(content: str, *salt: str) -> str:
+        """
+        Build key of snapshot from website content and optional salt
+        """
+        contenthash = hashlib.sha256(content.encode("utf-8"))
+        for current_salt in salt:
+            contenthash.update(str(current_salt).encode("utf-8"))
+        return contenthash.hexdigest()
+
+    ############################################################################
+    def load(self: object, contenthash: str) -> list[tuple]:
+        """
+        Read records from snapshot file, None if snapshot is missing or outdated
+        """
+        if not os.path.exists(self._cachename):
+            return None
+        try:
+            with open(self._cachename, "rb") as file:
+                version, snapshothash, records = pickle.load(file)
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+            logging.warning("snapshot file [{}] is unreadable, ignore it".format(self._cachename))
+            return None
+        if version != SnapshotCache._version or snapshothash != contenthash:
+            logging.info("snapshot file [{}] is outdated".format(self._cachename))
+            return None
+        logging.info("read [{}] records from snapshot file [{}]".format(len(records), self._cachename))
+        return records
+
+    ############################################################################
+    def save(self: object, contenthash: str, records: list[tuple]) -> None:
+        """
+        Write records to snapshot file, replace existing snapshot atomically
+        """
+        tempname: str = "{}.tmp".format(self._cachename)
+        try:
+            with open(tempname, "wb") as file:
+                pickle.dump((SnapshotCache._version, contenthash, records), file, pickle.HIGHEST_PROTOCOL)
+            os.replace(tempname, self._cachename)
+        except OSError:
+            logging.warning("cannot write snapshot file [{}]".format(self._cachename))
+            return
+        logging.info("saved [{}] records to snapshot file [{}]".format(len(records), self._cachename))
@@ -0,0 +1,178 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+import logging
+import os
+import sqlite3
+
+from taren.download import Download
+
+
+class StateDB:
+    """
+    Persistent state of the downloads between runs: size, modification time,
+    matched episode, team and the last action of each download. Downloads with
+    unchanged size and modification time are not matched again.
+    """
+
+    # Increase when the layout of the tables changes
+    _version: int = 1
+    # Actions of downloads which need no further processing
+    _final_actions: tuple[str] = ("owned", "renamed", "unmatched")
+
+    ############################################################################
+    def __init__(self: object, filename: str) -> None:
+        """
+        Default init of variables
+        """
+        self._filename: str = filename
+        self._connection: sqlite3.Connection = None
+        logging.debug("state database [{}]".format(self._filename))
+
+    ############################################################################
+    @staticmethod
+    def _normalize(path: str) -> str:
+        """
+        Normalized path, used as key of the downloads
+        """
+        return os.path.normcase(os.path.abspath(path))
+
+    ############################################################################
+    def _connect(self: object) -> sqlite3.Connection:
+        """
+        Open database on first use, recreate tables of an outdated layout
+        """
+        if self._connection is not None:
+            return self._connection
+        self._connection = sqlite3.connect(self._filename)
+        with self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row: tuple = self._connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or str(StateDB._version) != row[0]:
+                logging.info("state database [{}] is outdated, recreate it".format(self._filename))
+                self._connection.execute("DROP TABLE IF EXISTS downloads")
+                self._connection.execute("DELETE FROM meta")
+                self._connection.execute("INSERT INTO meta (key, value) VALUES ('version', ?)", (str(StateDB._version),))
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS downloads (path TEXT PRIMARY KEY, size INTEGER, mtime REAL, episode_id INTEGER, team TEXT, action TEXT)"
+            )
+        return self._connection
+
+    ############################################################################
+    def close(self: object) -> None:
+        """
+        Close database
+        """
+        if self._connection is None:
+            return
+        self._connection.close()
+        self._connection = None
+
+    ############################################################################
+    def set_catalog(self: object, cataloghash: str) -> None:
+        """
+        Remember the catalog the states are based on, forget all states when
+        the catalog changed
+        """
+        connection: sqlite3.Connection = self._connect()
+        row: tuple = connection.execute("SELECT value FROM meta WHERE key = 'catalog'").fetchone()
+        if row is not None and cataloghash == row[0]:
+            return
+        logging.info("catalog changed, reset state of downloads")
+        with connection:
+            connection.execute("DELETE FROM downloads")
+            connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('catalog', ?)", (cataloghash,))
+
+    ############################################################################
+    def reset(self: object) -> None:
+        """
+        Forget state of all downloads, e.g. after failed operations
+        """
+        connection: sqlite3.Connection = self._connect()
+        with connection:
+            connection.execute("DELETE FROM downloads")
+
+    ############################################################################
+    def get_unchanged(self: object, downloads: list[Download]) -> dict[str, tuple[int, str]]:
+        """
+        Episode and action of downloads which are unchanged since their last
+        processing and need no further processing, by FQN
+        """
+        connection: sqlite3.Connection = self._connect()
+        states: dict[str, tuple[int, float, int, str]] = {}
+        for path, size, mtime, episode_id, action in connection.execute("SELECT path, size, mtime, episode_id, action FROM downloads"):
+            states[path] = (size, mtime, episode_id, action)
+
+        unchanged: dict[str, tuple[int, str]] = {}
+        for download in downloads:
+            fqn: str = download.get_fqn()
+            state: tuple[int, float, int, str] = states.get(self._normalize(fqn))
+            if state is None or state[0] != download.size or state[1] != download.mtime:
+                continue
+            if state[3] not in StateDB._final_actions:
+                continue
+            unchanged[fqn] = (state[2], state[3])
+        return unchanged
+
+    ############################################################################
+    def update(self: object, states: dict[str, tuple[int, float, int, str]]) -> None:
+        """
+        Store size, modification time, episode and action by FQN, a state of
+        None removes the download
+        """
+        removed: list[tuple[str]] = []
+        changed: list[tuple[str, int, float, int, str]] = []
+        for fqn, state in states.items():
+            if state is None:
+                removed.append((self._normalize(fqn),))
+                continue
+            changed.append((self._normalize(fqn),) + tuple(state))
+        connection: sqlite3.Connection = self._connect()
+        with connection:
+            connection.executemany("DELETE FROM downloads WHERE path = ?", removed)
+            connection.executemany("INSERT OR REPLACE INTO downloads (path, size, mtime, episode_id, action) VALUES (?, ?, ?, ?, ?)", changed)
+        logging.debug("updated state of [{}] downloads, removed [{}]".format(len(changed), len(removed)))
+
+    ############################################################################
+    def set_teams(self: object, teams: list[tuple[str, str]]) -> None:
+        """
+        Store team of downloads given as tuples (FQN, team)
+        """
+        connection: sqlite3.Connection = self._connect()
+        with connection:
+            connection.executemany("UPDATE downloads SET team = ? WHERE path = ?", [(team, self._normalize(fqn)) for fqn, team in teams])
+
+    ############################################################################
+    def prune(self: object, downloads: list[Download]) -> None:
+        """
+        Remove states of downloads which do not exist anymore
+        """
+        existing: set[str] = set([self._normalize(download.get_fqn()) for download in downloads])
+        connection: sqlite3.Connection = self._connect()
+        paths: list[str] = [path for (path,) in connection.execute("SELECT path FROM downloads") if path not in existing]
+        with connection:
+            connection.executemany("DELETE FROM downloads WHERE path = ?", [(path,) for path in paths])
+        logging.debug("pruned state of [{}] downloads".format(len(paths)))
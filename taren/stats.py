@@ -24,6 +24,13 @@ SOFTWARE.
 ******************************************************************************
 """
 
+import contextlib
+import json
+import math
+import os
+import time
+from typing import Iterator
+
 
 class Stats:
     """
@@ -32,8 +39,13 @@ class Stats:
     - Episodes owned
     - Downloads deleted
     - Downloads in trash
+    Additionally wall and CPU time per phase, latency of matching per strategy
+    and counts of syscalls are recorded.
     """
 
+    # Upper bounds of the buckets of the latency histograms in seconds
+    _buckets: tuple[float] = (0.000001, 0.00001, 0.0001, 0.001, 0.01, 0.1, math.inf)
+
     ############################################################################
     def __init__(self: object) -> None:
         self.downloads_deleted: int = 0
@@ -43,6 +55,13 @@ class Stats:
         self.downloads_trash: int = 0
         self.episodes_owned: int = 0
         self.episodes_total: int = 0
+        # Wall and CPU time by phase
+        self.timers: dict[str, list[float]] = {}
+        # Bucket counts and sum of latencies by strategy
+        self.latencies: dict[str, list[int]] = {}
+        self.latency_sums: dict[str, float] = {}
+        # Number of syscalls by name
+        self.syscalls: dict[str, int] = {}
 
     ############################################################################
     def __repr__(self):
@@ -52,6 +71,130 @@ class Stats:
     ############################################################################
     def __str__(self):
         """Represent statistics as string"""
+        owned: float = 0.0
+        if 0 < self.episodes_total:
+            owned = 100 / self.episodes_total * self.episodes_owned
         return "\n episodes total [{}],\n episodes owned [{}/{:3.2f}%],\n downloads deleted [{}],\n downloads moved [{}],\n downloads renamed [{}],\n downloads total [{}],\n downloads trash [{}]".format(
-            self.episodes_total, self.episodes_owned, (100 / self.episodes_total * self.episodes_owned), self.downloads_deleted, self.downloads_moved, self.downloads_renamed, self.downloads_total, self.downloads_trash
+            self.episodes_total, self.episodes_owned, owned, self.downloads_deleted, self.downloads_moved, self.downloads_renamed, self.downloads_total, self.downloads_trash
         )
+
+    ############################################################################
+    @contextlib.contextmanager
+    def timer(self: object, phase: str) -> Iterator[None]:
+        """
+        Measure wall and CPU time of a phase, repeated phases are summed up
+        """
+        wall: float = time.perf_counter()
+        cpu: float = time.process_time()
+        try:
+            yield
+        finally:
+            timer: list[float] = self.timers.setdefault(phase, [0.0, 0.0])
+            timer[0] += time.perf_counter() - wall
+            timer[1] += time.process_time() - cpu
+
+    ############################################################################
+    def observe(self: object, strategy: str, latency: float) -> None:
+        """
+        Add latency of a single match to histogram of strategy
+        """
+        buckets: list[int] = self.latencies.get(strategy)
+        if buckets is None:
+            buckets = [0] * len(Stats._buckets)
+            self.latencies[strategy] = buckets
+            self.latency_sums[strategy] = 0.0
+        for position, bound in enumerate(Stats._buckets):
+            if latency <= bound:
+                buckets[position] += 1
+                break
+        self.latency_sums[strategy] += latency
+
+    ############################################################################
+    def add_syscalls(self: object, syscalls: dict[str, int]) -> None:
+        """
+        Add counts of syscalls by name
+        """
+        for name, count in syscalls.items():
+            self.syscalls[name] = self.syscalls.get(name, 0) + count
+
+    ############################################################################
+    def get_counters(self: object) -> dict[str, int]:
+        """
+        Plain counters by name
+        """
+        return {
+            "downloads_deleted": self.downloads_deleted,
+            "downloads_moved": self.downloads_moved,
+            "downloads_renamed": self.downloads_renamed,
+            "downloads_total": self.downloads_total,
+            "downloads_trash": self.downloads_trash,
+            "episodes_owned": self.episodes_owned,
+            "episodes_total": self.episodes_total,
+        }
+
+    ############################################################################
+    def to_dict(self: object) -> dict:
+        """
+        All statistics as dictionary
+        """
+        latencies: dict[str, dict] = {}
+        for strategy, buckets in self.latencies.items():
+            latencies[strategy] = {
+                "buckets": [[str(bound), count] for bound, count in zip(Stats._buckets, buckets)],
+                "count": sum(buckets),
+                "sum": self.latency_sums[strategy],
+            }
+        return {
+            "counters": self.get_counters(),
+            "phases": {phase: {"wall": timer[0], "cpu": timer[1]} for phase, timer in self.timers.items()},
+            "latencies": latencies,
+            "syscalls": dict(self.syscalls),
+        }
+
+    ############################################################################
+    def to_json(self: object) -> str:
+        """
+        All statistics as JSON document
+        """
+        return json.dumps(self.to_dict(), indent=4)
+
+    ############################################################################
+    def to_prometheus(self: object) -> str:
+        """
+        All statistics in text format of Prometheus
+        """
+        lines: list[str] = []
+        for name, value in self.get_counters().items():
+            lines.append("# TYPE taren_{} gauge".format(name))
+            lines.append("taren_{} {}".format(name, value))
+        lines.append("# TYPE taren_phase_wall_seconds gauge")
+        for phase, timer in self.timers.items():
+            lines.append('taren_phase_wall_seconds{{phase="{}"}} {}'.format(phase, timer[0]))
+        lines.append("# TYPE taren_phase_cpu_seconds gauge")
+        for phase, timer in self.timers.items():
+            lines.append('taren_phase_cpu_seconds{{phase="{}"}} {}'.format(phase, timer[1]))
+        lines.append("# TYPE taren_match_latency_seconds histogram")
+        for strategy, buckets in self.latencies.items():
+            cumulated: int = 0
+            for bound, count in zip(Stats._buckets, buckets):
+                cumulated += count
+                bucket: str = "+Inf" if math.isinf(bound) else str(bound)
+                lines.append('taren_match_latency_seconds_bucket{{strategy="{}",le="{}"}} {}'.format(strategy, bucket, cumulated))
+            lines.append('taren_match_latency_seconds_sum{{strategy="{}"}} {}'.format(strategy, self.latency_sums[strategy]))
+            lines.append('taren_match_latency_seconds_count{{strategy="{}"}} {}'.format(strategy, cumulated))
+        lines.append("# TYPE taren_syscalls_total counter")
+        for name, count in self.syscalls.items():
+            lines.append('taren_syscalls_total{{call="{}"}} {}'.format(name, count))
+        return "\n".join(lines) + "\n"
+
+    ############################################################################
+    def export(self: object, filename: str) -> None:
+        """
+        Write statistics to file, Prometheus text format for extension '.prom',
+        JSON otherwise. The file is replaced atomically.
+        """
+        content: str = self.to_prometheus() if filename.endswith(".prom") else self.to_json()
+        tempname: str = "{}.tmp".format(filename)
+        with open(tempname, "w", encoding="utf-8") as file:
+            file.write(content)
+        os.replace(tempname, filename)
@@ -0,0 +1,100 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+from collections import deque
+
+
+class SubstringAutomaton:
+    """
+    Aho-Corasick automaton to find all given patterns inside of a text with a
+    single pass over the text
+    """
+
+    ############################################################################
+    def __init__(self: object, patterns: list[str]) -> None:
+        """
+        Build trie of patterns and calculate failure links
+        """
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[tuple[str, ...]] = [()]
+        for pattern in patterns:
+            self._add_pattern(pattern)
+        self._build_failure_links()
+
+    ############################################################################
+    def _add_pattern(self: object, pattern: str) -> None:
+        """
+        Add single pattern to trie
+        """
+        state: int = 0
+        for character in pattern:
+            next_state: int = self._goto[state].get(character, 0)
+            if 0 == next_state:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+                self._goto[state][character] = next_state
+            state = next_state
+        if pattern not in self._output[state]:
+            self._output[state] = self._output[state] + (pattern,)
+
+    ############################################################################
+    def _build_failure_links(self: object) -> None:
+        """
+        Breadth first walk over trie to set failure links and merge outputs
+        """
+        queue: deque = deque(self._goto[0].values())
+        while queue:
+            state: int = queue.popleft()
+            for character, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback: int = self._fail[state]
+                while fallback and character not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(character, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    ############################################################################
+    def find_all(self: object, text: str) -> set[str]:
+        """
+        Return all patterns which are part of the text
+        """
+        found: set[str] = set()
+        goto: list[dict[str, int]] = self._goto
+        fail: list[int] = self._fail
+        output: list[tuple[str, ...]] = self._output
+        state: int = 0
+        for character in text:
+            while state and character not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(character, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
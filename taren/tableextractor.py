@@ -0,0 +1,296 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+import re
+from collections import deque
+from html.parser import HTMLParser
+from typing import Iterator
+
+
+class TableExtractor(HTMLParser):
+    """
+    Streaming extraction of the rows of the first table of a HTML page. The
+    result equals find("table").find_all("tr") and the texts of all cells of
+    each row using BeautifulSoup with 'html.parser', but no document tree is
+    built and parsing stops at the end of the first table.
+    """
+
+    # Elements without content and end tag
+    _void_tags: frozenset[str] = frozenset(
+        ["area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr", "image", "img", "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid", "param", "source", "spacer", "track", "wbr"]
+    )
+    # Text of these elements is not part of the text of a cell
+    _hidden_tags: frozenset[str] = frozenset(["rp", "rt", "script", "style", "template"])
+    # Whitespace of these elements is kept
+    _preserve_tags: frozenset[str] = frozenset(["pre", "textarea"])
+    # Removes whitespace as defined by BeautifulSoup
+    _ascii_spaces: dict[int, None] = str.maketrans("", "", "\x20\x0a\x09\x0c\x0d")
+    # Tags in their usual form, including quoted attributes, used to split a table
+    _tag_pattern: re.Pattern = re.compile(r"""<(/?)([a-zA-Z][^\t\n\r\f />\x00]*)[^<>"']*(?:(?:"[^<"]*"|'[^<']*')[^<>"']*)*>""")
+    # Elements with raw text content, depending on the Python version
+    _raw_tags: tuple[str] = ("iframe", "noembed", "noframes", "noscript", "plaintext", "script", "style", "textarea", "title", "xmp")
+    # Content which changes the way the following tags are parsed
+    _unsafe_pattern: re.Pattern = re.compile(r"<(?:!|\?|/?(?:{})\b)".format("|".join(_raw_tags)), re.IGNORECASE)
+    # Elements which may stay open between the rows of a split table
+    _section_tags: frozenset[str] = frozenset(["tbody", "tfoot", "thead"])
+
+    ############################################################################
+    def __init__(self: object) -> None:
+        """
+        Default init of variables
+        """
+        super().__init__(convert_charrefs=True)
+        # Open elements as [tag, row or cell]
+        self._stack: list[list] = []
+        # Position of first table in stack, None outside the first table
+        self._table: int = None
+        self._finished: bool = False
+        # Rows in order of their start as [cells, closed]
+        self._rows: deque[list] = deque()
+        self._ready: deque[list[str]] = deque()
+        # Cells and rows currently open
+        self._open_cells: list[list[str]] = []
+        self._open_rows: list[list] = []
+        self._hidden: int = 0
+        self._preserve: int = 0
+        self._data: list[str] = []
+
+    ############################################################################
+    def _flush(self: object) -> None:
+        """
+        Add collected text to all open cells, whitespace is handled like BeautifulSoup does
+        """
+        if 0 == len(self._data):
+            return
+        text: str = "".join(self._data)
+        self._data = []
+        if 0 == self._preserve and "" == text.translate(TableExtractor._ascii_spaces):
+            text = "\n" if "\n" in text else " "
+        for cell in self._open_cells:
+            cell.append(text)
+
+    ############################################################################
+    @staticmethod
+    def _remove(entries: list[list], entry: list) -> None:
+        """
+        Remove entry by identity, equal rows or cells are different entries
+        """
+        for position in range(len(entries) - 1, -1, -1):
+            if entries[position] is entry:
+                del entries[position]
+                return
+
+    ############################################################################
+    def _close(self: object, entry: list) -> None:
+        """
+        Element is closed, complete rows are passed on in order of their start
+        """
+        tag: str = entry[0]
+        if tag in TableExtractor._hidden_tags:
+            self._hidden -= 1
+        if tag in TableExtractor._preserve_tags:
+            self._preserve -= 1
+        if self._table is None:
+            return
+        if len(self._stack) == self._table:
+            # First table is closed
+            self._table = None
+            self._finished = True
+            return
+        if "td" == tag and entry[1] is not None:
+            self._remove(self._open_cells, entry[1])
+        if "tr" == tag and entry[1] is not None:
+            self._remove(self._open_rows, entry[1])
+            entry[1][1] = True
+            while self._rows and self._rows[0][1]:
+                self._ready.append(["".join(cell) for cell in self._rows.popleft()[0]])
+
+    ############################################################################
+    def handle_starttag(self: object, tag: str, attrs: list) -> None:
+        """
+        Open element, rows and cells of the first table are tracked
+        """
+        if self._finished:
+            return
+        self._flush()
+        if tag in TableExtractor._void_tags:
+            return
+        entry: list = [tag, None]
+        if "table" == tag and self._table is None:
+            self._table = len(self._stack)
+        elif "tr" == tag and self._table is not None:
+            entry[1] = [[], False]
+            self._rows.append(entry[1])
+            self._open_rows.append(entry[1])
+        elif "td" == tag and self._table is not None:
+            entry[1] = []
+            self._open_cells.append(entry[1])
+            for row in self._open_rows:
+                row[0].append(entry[1])
+        if tag in TableExtractor._hidden_tags:
+            self._hidden += 1
+        if tag in TableExtractor._preserve_tags:
+            self._preserve += 1
+        self._stack.append(entry)
+
+    ############################################################################
+    def handle_endtag(self: object, tag: str) -> None:
+        """
+        Close most recent open element of tag and all elements opened afterwards
+        """
+        if self._finished:
+            return
+        self._flush()
+        for position in range(len(self._stack) - 1, -1, -1):
+            if tag == self._stack[position][0]:
+                while position < len(self._stack) and not self._finished:
+                    self._close(self._stack.pop())
+                return
+
+    ############################################################################
+    def handle_data(self: object, data: str) -> None:
+        """
+        Collect text of cells
+        """
+        if self._finished or 0 == len(self._open_cells) or 0 < self._hidden:
+            return
+        self._data.append(data)
+
+    ############################################################################
+    def handle_comment(self: object, data: str) -> None:
+        """
+        Comments are not part of the text
+        """
+        self._flush()
+
+    ############################################################################
+    def unknown_decl(self: object, data: str) -> None:
+        """
+        Content of CDATA sections is part of the text, even in hidden elements
+        """
+        self._flush()
+        if data.upper().startswith("CDATA[") and 0 < len(self._open_cells):
+            self._data.append(data[6:])
+            self._flush()
+
+    ############################################################################
+    @staticmethod
+    def extract_rows(content: str, chunksize: int = 65536) -> Iterator[list[str]]:
+        """
+        Texts of the cells of each row of the first table, the content is fed
+        in chunks and rows are passed on as soon as they are complete
+        """
+        extractor: TableExtractor = TableExtractor()
+        for position in range(0, len(content), chunksize):
+            extractor.feed(content[position : position + chunksize])
+            while extractor._ready:
+                yield extractor._ready.popleft()
+            if extractor._finished:
+                return
+        extractor.close()
+        extractor._flush()
+        # Rows of a table which is not closed at the end of the document
+        extractor._finished = True
+        for row in extractor._rows:
+            extractor._ready.append(["".join(cell) for cell in row[0]])
+        while extractor._ready:
+            yield extractor._ready.popleft()
+
+    ############################################################################
+    @staticmethod
+    def _is_closed(content: str, position: int, opening: str, closing: str) -> bool:
+        """
+        Check that the last opening before position is closed before position
+        """
+        openings: list[re.Match] = list(re.finditer(opening, content[:position], re.IGNORECASE))
+        if 0 == len(openings):
+            return True
+        return re.search(closing, content[openings[-1].end() : position], re.IGNORECASE) is not None
+
+    ############################################################################
+    @staticmethod
+    def split_rows(content: str, partsize: int) -> list[str]:
+        """
+        Split page into parts of about the given size at the end of rows of the
+        first table. Extracting the rows of each part and joining them gives the
+        rows of the whole page. Whenever the structure of the table is not as
+        simple as expected, the page is returned as single part.
+        """
+        start: re.Match = re.search(r"<table[\s/>]", content, re.IGNORECASE)
+        if start is None or len(content) <= partsize:
+            return [content]
+        # Start of the table must not be part of a tag, comment or script
+        if "<![" in content[: start.start()] or content.rfind(">", 0, start.start()) < content.rfind("<", 0, start.start()):
+            return [content]
+        # Hidden or preserved text before the table could still affect the cells,
+        # scripts and styles are checked to be closed already
+        if re.search(r"<(?:{})\b".format("|".join((TableExtractor._hidden_tags | TableExtractor._preserve_tags) - {"script", "style"})), content[: start.start()], re.IGNORECASE):
+            return [content]
+        if not TableExtractor._is_closed(content, start.start(), "<!--", "-->"):
+            return [content]
+        for raw in TableExtractor._raw_tags:
+            if not TableExtractor._is_closed(content, start.start(), r"<{}\b".format(raw), "</{}".format(raw)):
+                return [content]
+        tag: re.Match = TableExtractor._tag_pattern.match(content, start.start())
+        if tag is None or tag.group(0).endswith("/>"):
+            return [content]
+        # Track open elements within the table, possible splits are after rows
+        # which leave only sections of the table open
+        body: int = tag.end()
+        stack: list[str] = []
+        splits: list[int] = [0]
+        tags: int = 0
+        void_tags: frozenset[str] = TableExtractor._void_tags
+        section_tags: frozenset[str] = TableExtractor._section_tags
+        for tag in TableExtractor._tag_pattern.finditer(content, body):
+            closing, name = tag.group(1, 2)
+            name = name.lower()
+            if closing:
+                if "table" == name:
+                    break
+                if name not in stack:
+                    return [content]
+                del stack[len(stack) - 1 - stack[::-1].index(name) :]
+                if "tr" == name and section_tags.issuperset(stack) and partsize <= tag.end() - splits[-1]:
+                    splits.append(tag.end())
+            elif "table" == name:
+                # Nested tables are not split
+                return [content]
+            elif name not in void_tags and "/" != content[tag.end() - 2]:
+                stack.append(name)
+            tags += 1
+        else:
+            # First table is not closed
+            return [content]
+        # Every bracket has to be a plain tag, no comments, scripts or other markup
+        if content.count("<", body, tag.start()) != tags or TableExtractor._unsafe_pattern.search(content, body, tag.start()):
+            return [content]
+        if 1 == len(splits):
+            return [content]
+        parts: list[str] = [content[: splits[1]]]
+        for begin, end in zip(splits[1:], splits[2:] + [tag.end()]):
+            parts.append("<table>" + content[begin:end])
+        return parts
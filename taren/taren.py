@@ -26,15 +26,28 @@ SOFTWARE.
 
 import logging
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
+from taren.download import Download
 from taren.downloadlist import DownloadList
 from taren.episode import Episode
 from taren.episodelist import EpisodeList
+from taren.executor import Executor
+from taren.fingerprint import Fingerprint
 from taren.grouping import Grouping
+from taren.helper import Helper
+from taren.journal import Journal
+from taren.operation import Operation
+from taren.planner import Planner
+from taren.profiler import Profiler
+from taren.snapshotcache import SnapshotCache
+from taren.statedb import StateDB
 from taren.stats import Stats
 from taren.tarenconfig import TarenConfig
 from taren.teamlist import TeamList
 from taren.trash import Trash
+from taren.websitecache import WebSiteCache
+from taren.websitefetcher import WebSiteFetcher
 
 
 class TaRen:
@@ -46,27 +59,63 @@ class TaRen:
     """
 
     ############################################################################
-    def __init__(self: object, config: TarenConfig) -> None:
+    def __init__(self: object, config: TarenConfig, profiler: Profiler = None) -> None:
         self._config: TarenConfig = config
+        self._profiler: Profiler = profiler or Profiler()
         self._searchdir: str = self._sanitize_path(self._config.value_get("taren", "downloads"))
         self._pattern: str = self._config.value_get("taren", "pattern")
+        self._recursive: bool = "true" == self._config.value_get("taren", "recursive").lower()
         self._teamlist: str = self._config.value_get("taren", "teamlist")
         self._extension: str = self._sanitize_extension(self._config.value_get("taren", "extension"))
         self._url: str = self._config.value_get("taren", "wiki")
         self._url_team: str = self._config.value_get("taren", "wiki_team")
         self._cachetime: int = int(self._config.value_get("taren", "maxcache"))
+        self._parser: str = self._config.value_get("taren", "parser")
+        self._parse_workers: int = int(self._config.value_get("taren", "parse_workers"))
+        self._cachedir: str = self._config.value_get("taren", "cachedir")
+        self._cachecompression: str = self._config.value_get("taren", "cachecompression")
+        self._cachestale: bool = "true" == self._config.value_get("taren", "cachestale").lower()
+        self._maxstale: int = int(self._config.value_get("taren", "maxstale"))
+        self._fetch_backoff: float = float(self._config.value_get("taren", "fetch_backoff"))
+        self._fetch_retries: int = int(self._config.value_get("taren", "fetch_retries"))
+        self._fetch_timeout: float = float(self._config.value_get("taren", "fetch_timeout"))
         self._trashage: int = int(self._config.value_get("taren", "trashage"))
+        self._dedupe: bool = "true" == self._config.value_get("taren", "dedupe").lower()
+        self._grouping: bool = "true" == self._config.value_get("taren", "grouping").lower()
+        self._playlist: str = self._config.value_get("taren", "playlist")
+        self._fingerprint: Fingerprint = Fingerprint(self._config.value_get("taren", "fingerprint"))
+        self._episode_list: EpisodeList = None
+        self._team_list: TeamList = None
         self._trash: Trash = Trash(
             self._config.value_get("taren", "downloads"), self._config.value_get("taren", "trash"), self._trashage, self._config.value_get("taren", "trashignore")
         )
+        self._journal_recovery: str = self._config.value_get("taren", "journal_recovery")
+        self._state: StateDB = StateDB(self._config.value_get("taren", "state"))
+        self._statsfile: str = self._config.value_get("taren", "statsfile")
+        self._executor: Executor = Executor(self._trash, int(self._config.value_get("taren", "workers")), Journal(self._config.value_get("taren", "journal")))
         logging.debug("self._config [{}]".format(self._config))
         logging.debug("self._searchdir [{}]".format(self._searchdir))
         logging.debug("self._pattern [{}]".format(self._pattern))
+        logging.debug("self._recursive [{}]".format(self._recursive))
         logging.debug("self._extension [{}]".format(self._extension))
         logging.debug("self._url [{}]".format(self._url))
         logging.debug("self._url_team [{}]".format(self._url_team))
         logging.debug("self._cachetime [{}]".format(self._cachetime))
+        logging.debug("self._parser [{}]".format(self._parser))
+        logging.debug("self._parse_workers [{}]".format(self._parse_workers))
+        logging.debug("self._cachedir [{}]".format(self._cachedir))
+        logging.debug("self._cachecompression [{}]".format(self._cachecompression))
+        logging.debug("self._cachestale [{}]".format(self._cachestale))
+        logging.debug("self._maxstale [{}]".format(self._maxstale))
+        logging.debug("self._fetch_backoff [{}]".format(self._fetch_backoff))
+        logging.debug("self._fetch_retries [{}]".format(self._fetch_retries))
+        logging.debug("self._fetch_timeout [{}]".format(self._fetch_timeout))
         logging.debug("self._trashage [{}]".format(self._trashage))
+        logging.debug("self._dedupe [{}]".format(self._dedupe))
+        logging.debug("self._grouping [{}]".format(self._grouping))
+        logging.debug("self._playlist [{}]".format(self._playlist))
+        logging.debug("self._journal_recovery [{}]".format(self._journal_recovery))
+        logging.debug("self._statsfile [{}]".format(self._statsfile))
 
     ############################################################################
     def _sanitize_extension(self: object, extension: str) -> str:
@@ -87,7 +136,174 @@ class TaRen:
         return path
 
     ############################################################################
-    def rename_process(self: object) -> None:
+    def cleanup_trash(self: object, statistics: Stats) -> None:
+        """
+        Delete outdated files from trash and count remaining files
+        """
+        with statistics.timer("trash"):
+            # Cleanup trash
+            statistics.downloads_deleted = self._trash.cleanup()
+
+            # List trash
+            statistics.downloads_trash = self._trash.list()
+        statistics.add_syscalls(self._trash.get_syscalls())
+
+    ############################################################################
+    def export_stats(self: object, statistics: Stats) -> None:
+        """
+        Write statistics to configured file, nothing is written without file
+        """
+        if "" == self._statsfile:
+            return
+        try:
+            statistics.export(self._statsfile)
+        except OSError:
+            logging.warning("cannot write statistics to file [{}]".format(self._statsfile))
+
+    ############################################################################
+    def get_download_list(self: object) -> DownloadList:
+        """
+        Fresh listing of the downloads
+        """
+        return DownloadList(self._searchdir, self._pattern, self._extension, self._recursive, [self._trash.get_folder()])
+
+    ############################################################################
+    def _get_fetcher(self: object) -> WebSiteFetcher:
+        """
+        Pooled session to fetch the web pages
+        """
+        ua: str = self._config.value_get("taren", "wiki_useragent")
+        return WebSiteFetcher(ua, self._fetch_timeout, self._fetch_retries, self._fetch_backoff)
+
+    ############################################################################
+    def _get_lists(self: object, fetcher: WebSiteFetcher) -> tuple[EpisodeList, TeamList]:
+        """
+        Empty lists of episodes and teams with their cache settings
+        """
+        ua: str = self._config.value_get("taren", "wiki_useragent")
+        episode_list: EpisodeList = EpisodeList(
+            self._pattern, self._url, self._cachetime, ua, fetcher, self._parser, self._cachedir, self._cachecompression, self._cachestale, self._maxstale
+        )
+        team_list: TeamList = TeamList(
+            self._teamlist, self._url_team, self._cachetime, ua, fetcher, self._parser, self._cachedir, self._cachecompression, self._cachestale, self._maxstale
+        )
+        return episode_list, team_list
+
+    ############################################################################
+    def refresh_catalogs(self: object) -> None:
+        """
+        Revalidate cached web pages about episodes and teams, e.g. by a separate
+        job, so the next run uses fresh content without waiting for the network
+        """
+        fetcher: WebSiteFetcher = self._get_fetcher()
+        episode_list, team_list = self._get_lists(fetcher)
+        fetcher.refresh({"wiki": episode_list.get_cache(), "wiki_team": team_list.get_cache()})
+
+    ############################################################################
+    def _parse_catalogs(self: object, episode_list: EpisodeList, team_list: TeamList, websites: dict[str, str]) -> None:
+        """
+        Parse both web pages at the same time, parts of the pages are parsed by
+        a shared pool of worker processes. The processes are only started when
+        a page is not covered by its snapshot.
+        """
+        with self._profiler.trace("get_catalogs"), ProcessPoolExecutor(max_workers=self._parse_workers, mp_context=Helper.get_process_context()) as processes:
+            with ThreadPoolExecutor(max_workers=2) as threads:
+                episodes = threads.submit(episode_list.get_episodes, websites["wiki"], processes)
+                teams = threads.submit(team_list.get_teams, websites["wiki_team"], processes)
+                # Raise errors of parsing
+                episodes.result()
+                teams.result()
+
+    ############################################################################
+    def load_catalogs(self: object, statistics: Stats = None) -> None:
+        """
+        Get website content about episodes and teams and build internal lists
+        """
+        if statistics is None:
+            statistics = Stats()
+
+        # Fetch all web pages concurrently using one pooled session
+        fetcher: WebSiteFetcher = self._get_fetcher()
+        episode_list, team_list = self._get_lists(fetcher)
+        caches: dict[str, WebSiteCache] = {"wiki": episode_list.get_cache(), "wiki_team": team_list.get_cache()}
+        with statistics.timer("fetch"):
+            websites: dict[str, str] = fetcher.prefetch(caches)
+
+        with statistics.timer("parse"):
+            if self._parse_workers > 1:
+                self._parse_catalogs(episode_list, team_list, websites)
+            else:
+                # Get list of episodes from web page
+                with self._profiler.trace("get_episodes"):
+                    episode_list.get_episodes(websites["wiki"])
+
+                # Get list of teams from web page
+                with self._profiler.trace("get_teams"):
+                    team_list.get_teams(websites["wiki_team"])
+
+        self._episode_list = episode_list
+        self._team_list = team_list
+
+        # States of downloads are only valid for the same episodes and extension
+        self._state.set_catalog(SnapshotCache.get_hash(episode_list.get_hash(), self._extension))
+
+    ############################################################################
+    def rename_downloads(self: object, download_list: DownloadList, downloads: list[Download], statistics: Stats = None) -> Stats:
+        """
+        Match given downloads against the episodes and rename them. First all
+        operations are planned, the listing of the downloads reflects the planned
+        result. Afterwards the operations are executed in parallel.
+        """
+        # Object to handle statistics
+        if statistics is None:
+            statistics = Stats()
+        statistics.episodes_total = self._episode_list.get_episode_count()
+        statistics.downloads_total = len(downloads)
+
+        # Skip downloads unchanged since the last run
+        with statistics.timer("state"):
+            unchanged: dict[str, tuple[int, str]] = self._state.get_unchanged(downloads)
+        statistics.episodes_owned += len([action for _, action in unchanged.values() if "unmatched" != action])
+        downloads = [current_download for current_download in downloads if current_download.get_fqn() not in unchanged]
+        logging.info("downloads unchanged since last run [{}]".format(len(unchanged)))
+
+        # Match downloads and plan operations
+        planner: Planner = Planner(self._episode_list, self._extension, self._fingerprint)
+        with statistics.timer("match"):
+            remaining, keys = planner.skip_owned(downloads, statistics)
+            downloads_to_process: list[tuple[Download, Episode]] = planner.match(remaining, statistics, keys)
+        with statistics.timer("plan"):
+            operations: list[Operation] = planner.plan(download_list, downloads_to_process, statistics)
+        statistics.add_syscalls(download_list.get_syscalls())
+
+        # Execute planned operations
+        with statistics.timer("rename"):
+            failed: int = self._executor.execute(operations)
+        statistics.add_syscalls({"rename": len([operation for operation in operations if Operation.RENAME == operation.kind])})
+        if 0 < failed:
+            logging.error("[{}] of [{}] operations failed".format(failed, len(operations)))
+            # Result on disk differs from plan, process all downloads next time
+            self._state.reset()
+        else:
+            self._state.update(planner.get_states())
+        self._fingerprint.save()
+
+        return statistics
+
+    ############################################################################
+    def report_duplicates(self: object, download_list: DownloadList) -> int:
+        """
+        Report downloads with equal content, regardless of their names
+        """
+        duplicates: list[list[str]] = self._fingerprint.find_duplicates(download_list.get_downloads())
+        for group in duplicates:
+            logging.warning("downloads with equal content [{}]".format("] [".join(group)))
+        self._fingerprint.save()
+        logging.info("groups of duplicate downloads [{}]".format(len(duplicates)))
+        return len(duplicates)
+
+    ############################################################################
+    def rename_process(self: object) -> bool:
         """
         Controls the complete process:
         - Get website content about the episodes
@@ -98,102 +314,49 @@ class TaRen:
         # Check path of downloads
         if not os.path.exists(self._searchdir):
             logging.error("Path [{}] does not exist or not found, abort".format(self._searchdir))
-            return
+            return False
 
         # Object to handle statistics
         statistics: Stats = Stats()
 
-        # Get list of episodes from web page
-        ua: str = self._config.value_get("taren", "wiki_useragent")
-        episode_list: EpisodeList = EpisodeList(self._pattern, self._url, self._cachetime, ua)
-        episode_list.get_episodes()
-        statistics.episodes_total = episode_list.get_episode_count()
-
-        # Get list of downloads from filesystem
-        download_list: DownloadList = DownloadList(self._searchdir, self._pattern, self._extension)
-        downloads: list[str] = download_list.get_filenames()
-        statistics.downloads_total = len(downloads)
+        # Get lists of episodes and teams from web pages
+        self.load_catalogs(statistics)
 
         # Check for trash
         if not self._trash.init():
             return False
 
-        # Create list of downloads to process
-        downloads_to_process: list[str] = []
-        for current_download in downloads:
-            episode: Episode = episode_list.find_episode(current_download)
-            if episode.empty:
-                continue
-            downloads_to_process.append([current_download, episode])
-            # logging.debug("added dowload to process list: [{}]".format(current_download))
-        logging.info("downloads_to_process [{}]".format(len(downloads_to_process)))
-
-        # Process downloads
-        for current_download in downloads_to_process:
-            new_fqn: str = os.path.join(self._searchdir, "{}{}".format(current_download[1], self._extension))
-            old_fqn: str = os.path.join(self._searchdir, current_download[0])
-
-            if new_fqn == old_fqn:
-                # Already processed episode
-                # logging.debug("filenames identical, skip file [{}]".format(old_fqn))
-                statistics.episodes_owned += 1
-                continue
-
-            if os.path.exists(new_fqn):
-                # New episode already exists
-                # logging.debug("file already exists [{}]".format(new_fqn))
-                size_old: int = os.stat(old_fqn).st_size
-                size_new: int = os.stat(new_fqn).st_size
-
-                if size_old == size_new:
-                    # Episode and download are equal
-                    logging.info("file size equal, move file [{}] to trash".format(new_fqn))
-                    # Move to trash
-                    self._trash.move(new_fqn)
-                    statistics.downloads_moved += 1
-
-                if size_old > size_new:
-                    # Episode is greater than download
-                    logging.info("one file smaller than the other one, move file [{}] to trash".format(new_fqn))
-                    # Move to trash
-                    self._trash.move(new_fqn)
-                    statistics.downloads_moved += 1
-
-                if size_old < size_new:
-                    # Download is greater than episode
-                    logging.info("one file smaller than the other one, move file [{}] to trash".format(old_fqn))
-                    # Move to trash
-                    self._trash.move(old_fqn)
-                    statistics.downloads_moved += 1
-                    continue
-
-            # Rename download to name of episode
-            logging.info("rename from [{}] to [{}] filename".format(old_fqn, new_fqn))
-            os.rename(old_fqn, new_fqn)
-            statistics.downloads_renamed += 1
-
-        # Get list of episodes
-        team_list: TeamList = TeamList(self._teamlist, self._url_team, self._cachetime, ua)
-        team_list.get_teams()
-
-        # Get list of episodes from web page
-        episode_list: EpisodeList = EpisodeList(self._pattern, self._url, self._cachetime, ua)
-        episode_list.get_episodes()
-        statistics.episodes_total = episode_list.get_episode_count()
+        # Handle interrupted run before listing the downloads
+        self._executor.recover(self._journal_recovery)
 
         # Get list of downloads from filesystem
-        download_list: DownloadList = DownloadList(self._searchdir, self._pattern, self._extension)
-        downloads: list[str] = download_list.get_filenames()
+        download_list: DownloadList = self.get_download_list()
+        with statistics.timer("listing"):
+            downloads: list[Download] = download_list.get_downloads()
+
+        # Rename downloads
+        self.rename_downloads(download_list, downloads, statistics)
+
+        # Library wide report of downloads with equal content
+        if self._dedupe:
+            self.report_duplicates(download_list)
+
+        # Forget downloads removed since the last run
+        self._state.prune(download_list.get_downloads())
 
-        # Create HTML file with list of episodes
-        grouping: Grouping = Grouping(self._config, team_list, episode_list, downloads)
-        # grouping.process()
+        # List of downloads after renaming, without listing the filesystem again
+        filenames: list[str] = download_list.get_filenames()
 
-        # Cleanup trash
-        statistics.downloads_deleted = self._trash.cleanup()
+        # Create HTML file with list of episodes, only when requested
+        if self._grouping and self._playlist:
+            grouping: Grouping = Grouping(self._playlist, self._searchdir, self._team_list, self._episode_list, filenames, self._state)
+            with statistics.timer("grouping"):
+                grouping.process()
 
-        # List trash
-        statistics.downloads_trash = self._trash.list()
+        # Cleanup and list trash
+        self.cleanup_trash(statistics)
 
         # Summary
         logging.info("summary: {}".format(statistics))
+        self.export_stats(statistics)
+        return True
@@ -42,15 +42,41 @@ class TarenConfig(MDO):
         self.add("logging", "logfile", "program.log")
         self.add("logging", "loglevel", "info")
         self.add("logging", "logstring", "%(asctime)s | %(levelname)s | %(filename)s:%(lineno)s:%(funcName)s | %(message)s")
+        self.add("logging", "ratelimit", "1000")
+        self.add("logging", "ratelimit_interval", "60")
+        self.add("profiling", "cprofile", "false")
+        self.add("profiling", "top", "25")
+        self.add("profiling", "tracemalloc", "false")
+        self.add("taren", "cachecompression", "gzip")
+        self.add("taren", "cachedir", "cache")
+        self.add("taren", "cachestale", "true")
+        self.add("taren", "dedupe", "false")
         self.add("taren", "downloads", "v:\\tatort")
         self.add("taren", "extension", "mp4")
+        self.add("taren", "fetch_backoff", "1")
+        self.add("taren", "fetch_retries", "3")
+        self.add("taren", "fetch_timeout", "30")
+        self.add("taren", "fingerprint", "taren.fingerprint")
+        self.add("taren", "grouping", "false")
+        self.add("taren", "journal", "taren.journal")
+        self.add("taren", "journal_recovery", "resume")
         self.add("taren", "maxcache", "6")
+        self.add("taren", "maxstale", "30")
+        self.add("taren", "parse_workers", "1")
+        self.add("taren", "parser", "stream")
         self.add("taren", "pattern", "Tatort")
         self.add("taren", "playlist", "v:\\tatort\\Tatort.html")
+        self.add("taren", "recursive", "false")
+        self.add("taren", "state", "taren.db")
+        self.add("taren", "statsfile", "taren.stats.json")
         self.add("taren", "teamlist", "Teams")
         self.add("taren", "trash", ".trash")
         self.add("taren", "trashage", "3")
         self.add("taren", "trashignore", ".ignore")
+        self.add("taren", "watch_debounce", "30")
+        self.add("taren", "watch_interval", "10")
+        self.add("taren", "watch_reload", "86400")
         self.add("taren", "wiki", "https://de.wikipedia.org/wiki/Liste_der_Tatort-Folgen")
         self.add("taren", "wiki_team", "https://de.wikipedia.org/wiki/Liste_der_Tatort-Ermittler")
         self.add("taren", "wiki_useragent", "TaRen/0.0 (https://github.com/ThirtySomething/TaRen/) generic-library/0.0")
+        self.add("taren", "workers", "4")
@@ -26,6 +26,7 @@ SOFTWARE.
 
 import logging
 import re
+import sys
 from datetime import date
 from typing import Match
 
@@ -41,15 +42,19 @@ class Team:
     # Invalid characters inside filenames on Windows
     _invalid_characters: list[str] = ['"', "*", "<", ">", "?", "\\", "|", "/", ":"]
 
+    # Compact storage without per instance dictionary
+    __slots__ = ("empty", "team_period_begin", "team_period_end", "team_inspectors", "team_location", "team_episode_count", "team_ended", "_canonical")
+
     ############################################################################
     def __init__(self: object) -> None:
         """
         Default is an empty team for __repr__ method
         """
+        self._canonical: str = None
         self.empty: bool = True
         self.team_period_begin: int = 0
         self.team_period_end: int = 0
-        self.team_inspectors: list[str] = []
+        self.team_inspectors: tuple[str, ...] = ()
         self.team_location: str = ""
         self.team_episode_count: int = 0
         self.team_ended: bool = False
@@ -60,14 +65,25 @@ class Team:
         Used for sorting
         """
         if isinstance(other, Team):
-            return self.__repr__() > other.__repr__()
+            return self.get_sort_key() > other.get_sort_key()
+        raise Exception("Cannot compare Team to Not-A-Team")
+
+    ############################################################################
+    def __lt__(self: object, other: object) -> bool:
+        """
+        Used for sorting
+        """
+        if isinstance(other, Team):
+            return self.get_sort_key() < other.get_sort_key()
         raise Exception("Cannot compare Team to Not-A-Team")
 
     ############################################################################
     def __repr__(self: object) -> str:
         """
-        Default string representation of an episode
+        Default string representation of an episode, cached for parsed teams
         """
+        if self._canonical is not None:
+            return self._canonical
         period: str = ""
         if self.team_ended:
             if self.team_period_begin == self.team_period_end:
@@ -87,8 +103,52 @@ class Team:
         """
         for current_invalid_character in Team._invalid_characters:
             self.team_location = self.team_location.replace(current_invalid_character, " ").strip()
-            for index, inspector in self.team_inspectors:
-                self.team_inspectors[index] = inspector.replace(current_invalid_character, " ").strip()
+            self.team_inspectors = tuple([inspector.replace(current_invalid_character, " ").strip() for inspector in self.team_inspectors])
+
+    ############################################################################
+    def _finish(self: object) -> None:
+        """
+        Share repeated strings between teams and cache string representation,
+        called once the team data is complete
+        """
+        self.team_inspectors = tuple([sys.intern(inspector) for inspector in self.team_inspectors])
+        self.team_location = sys.intern(self.team_location)
+        self._canonical = None
+        self._canonical = self.__repr__()
+
+    ############################################################################
+    @staticmethod
+    def from_record(record: tuple) -> "Team":
+        """
+        Create team from compact record, see get_record
+        """
+        team: Team = Team()
+        (
+            team.team_period_begin,
+            team.team_period_end,
+            team_inspectors,
+            team.team_location,
+            team.team_episode_count,
+            team.team_ended,
+        ) = record
+        team.team_inspectors = tuple(team_inspectors)
+        team.empty = False
+        team._finish()
+        return team
+
+    ############################################################################
+    def get_record(self: object) -> tuple:
+        """
+        Compact record of team data, used for snapshots
+        """
+        return (self.team_period_begin, self.team_period_end, tuple(self.team_inspectors), self.team_location, self.team_episode_count, self.team_ended)
+
+    ############################################################################
+    def get_sort_key(self: object) -> str:
+        """
+        Teams are sorted by their string representation
+        """
+        return self.__repr__()
 
     ############################################################################
     def matches(self: object, episode: Episode) -> bool:
@@ -140,6 +200,7 @@ class Team:
             self.team_period_end: int = int(team_period_raw.group(5))
 
         # Create list of inspectors
+        inspectors: list[str] = []
         # Split names by comma
         for cur_inspector in data_row[1].split(","):
             # Strip everything inside round brackets
@@ -147,7 +208,8 @@ class Team:
             # Split by space and get last element (this is the name of the inspector)
             inspector: str = inspector_raw.split(" ")[-1]
             # Append inspector to list
-            self.team_inspectors.append(inspector)
+            inspectors.append(inspector)
+        self.team_inspectors = tuple(inspectors)
 
         # Fiddle out location(s)
         locations: list[str] = []
@@ -169,3 +231,4 @@ class Team:
 
         # Mark as not empty
         self.empty = False
+        self._finish()
@@ -0,0 +1,81 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+from taren.episode import Episode
+from taren.substringautomaton import SubstringAutomaton
+from taren.team import Team
+
+
+class TeamIndex:
+    """
+    Lookup tables for a sorted list of teams. Resolves an episode with the
+    same result as Team.matches on each team, but only checks teams active in
+    the year of the episode and sharing an inspector with the episode.
+    """
+
+    ############################################################################
+    def __init__(self: object, teams: list[Team]) -> None:
+        """
+        Build year buckets and inverted index from inspector to team positions
+        """
+        self._teams: list[Team] = teams
+        # Positions of teams active in a year
+        self._years: dict[int, set[int]] = {}
+        # Positions of teams by lowercased inspector
+        self._inspectors: dict[str, set[int]] = {"": set()}
+        # Lowercased inspectors of each team
+        self._team_inspectors: list[frozenset[str]] = []
+        for position, team in enumerate(teams):
+            for year in range(team.team_period_begin, team.team_period_end + 1):
+                self._years.setdefault(year, set()).add(position)
+            inspectors: frozenset[str] = frozenset([inspector.lower() for inspector in team.team_inspectors])
+            self._team_inspectors.append(inspectors)
+            if 0 == len(inspectors):
+                # Team without inspector matches every episode of its period
+                self._inspectors[""].add(position)
+            for inspector in inspectors:
+                self._inspectors.setdefault(inspector, set()).add(position)
+        self._names: SubstringAutomaton = SubstringAutomaton([inspector for inspector in self._inspectors.keys() if inspector])
+
+    ############################################################################
+    def find(self: object, episode: Episode) -> Team:
+        """
+        Find first team matching the episode, empty team otherwise
+        """
+        active: set[int] = self._years.get(episode.episode_year)
+        if not active:
+            return Team()
+        # Inspectors of teams which are part of the inspectors of the episode, empty name is always part
+        found: set[str] = self._names.find_all(episode.episode_inspectors.lower())
+        found.add("")
+        candidates: set[int] = set()
+        for inspector in found:
+            candidates.update(self._inspectors[inspector])
+        candidates &= active
+        for position in sorted(candidates):
+            if self._team_inspectors[position] <= found:
+                return self._teams[position]
+        return Team()
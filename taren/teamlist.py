@@ -25,12 +25,21 @@ SOFTWARE.
 """
 
 import logging
+import os
+from concurrent.futures import Executor, Future
+from datetime import date
+
+from typing import Iterable
 
 from bs4 import BeautifulSoup
 
 from taren.episode import Episode
+from taren.snapshotcache import SnapshotCache
+from taren.tableextractor import TableExtractor
 from taren.team import Team
+from taren.teamindex import TeamIndex
 from taren.websitecache import WebSiteCache
+from taren.websitefetcher import WebSiteFetcher
 
 
 class TeamList:
@@ -39,29 +48,57 @@ class TeamList:
     """
 
     ############################################################################
-    def __init__(self: object, listname: str, url: str, cachetime: int, useragent: str) -> None:
+    def __init__(self: object, listname: str, url: str, cachetime: int, useragent: str, fetcher: WebSiteFetcher = None, parser: str = "stream", cachedir: str = ".", compression: str = "none", stale: bool = False, maxstale: int = None) -> None:
         self._listname: str = listname
         self._url: str = url
         self._cachetime: int = cachetime
         self._useragent: str = useragent
+        self._fetcher: WebSiteFetcher = fetcher
+        self._parser: str = parser
+        self._cachedir: str = cachedir
+        self._compression: str = compression
+        self._stale: bool = stale
+        self._maxstale: int = maxstale
+        # Size of the parts of the website handed out to a worker process
+        self._partsize: int = 262144
         self._teams: list[Team] = []
+        self._index: TeamIndex = TeamIndex(self._teams)
         logging.debug("listname [{}]".format(listname))
         logging.debug("url [{}]".format(url))
         logging.debug("cachetime [{}]".format(cachetime))
         logging.debug("useragent [{}]".format(useragent))
+        logging.debug("parser [{}]".format(parser))
+        logging.debug("cachedir [{}]".format(cachedir))
 
     ############################################################################
-    def _build_list_of_teams(self: object, raw_data: str) -> list[Team]:
+    @staticmethod
+    def _get_rows(websitecontent: str, parser: str) -> Iterable[list[str]]:
         """
-        Extract teams from team list
+        Get texts of the cells of the rows of the table with teams
+        """
+        if "bs4" == parser:
+            # Parse website using BeautifulSoup
+            websitedata: BeautifulSoup = BeautifulSoup(websitecontent, "html.parser")
+            # Get table with teams - there is only one tables
+            table: str = websitedata.find("table")
+            # Get texts of cells of each table row
+            rows: Iterable[list[str]] = [[i.text for i in table_row.find_all("td")] for table_row in table.find_all("tr")]
+        else:
+            # Stream rows of the first table without building a document tree
+            rows = TableExtractor.extract_rows(websitecontent)
+        return rows
+
+    ############################################################################
+    @staticmethod
+    def _parse_rows(raw_data: Iterable[list[str]]) -> list[Team]:
+        """
+        Extract teams from rows of the team list, keeps order of the rows
         """
         teams: list[Team] = []
         # For each HTML table row aka raw episode data
-        for table_row in raw_data:
-            # Extract all columns as cell
-            table_cells: list[str] = table_row.find_all("td")
+        for table_cells in raw_data:
             # Get content of cells
-            team_data: list[str] = [i.text.replace("\n", "") for i in table_cells]
+            team_data: list[str] = [i.replace("\n", "") for i in table_cells]
             # Create a new and empty episode
             current_team: Team = Team()
             # Parse raw data into episode object
@@ -70,23 +107,42 @@ class TeamList:
             if not current_team.empty:
                 teams.append(current_team)
                 # logging.debug("team [{}]".format(current_team))
+        return teams
+
+    ############################################################################
+    @staticmethod
+    def _parse_part(websitecontent: str, parser: str) -> list[tuple]:
+        """
+        Parse part of the website in a worker process, return the compact records
+        of the teams, which are cheaper to pass back than the objects
+        """
+        return [team.get_record() for team in TeamList._parse_rows(TeamList._get_rows(websitecontent, parser))]
+
+    ############################################################################
+    def _build_list_of_teams(self: object, raw_data: Iterable[list[str]]) -> list[Team]:
+        """
+        Extract teams from team list
+        """
+        teams: list[Team] = TeamList._parse_rows(raw_data)
         # Return list of teams
-        teams.sort()
+        teams.sort(key=Team.get_sort_key)
         return teams
 
     ############################################################################
-    def _parse_website(self: object, websitecontent: str) -> list[Team]:
-        """
-        Build internal list about teams based on website content.
-        """
-        # Parse website using BeautifulSoup
-        websitedata: BeautifulSoup = BeautifulSoup(websitecontent, "html.parser")
-        # Get table with teams - there is only one tables
-        table: str = websitedata.find("table")
-        # Get raw team data from table data row
-        rows: list[str] = table.find_all("tr")
-        # Build list of episodes for all rows
-        teams: list[Team] = self._build_list_of_teams(rows)
+    def _parse_website(self: object, websitecontent: str, executor: Executor = None) -> list[Team]:
+        """
+        Build internal list about teams based on website content. With an
+        executor the parts of the table are parsed by its worker processes.
+        """
+        if executor is None:
+            return self._build_list_of_teams(TeamList._get_rows(websitecontent, self._parser))
+        # Only the table of the streaming parser can be split, results are merged in order of the parts
+        parts: list[str] = [websitecontent]
+        if "stream" == self._parser:
+            parts = TableExtractor.split_rows(websitecontent, self._partsize)
+        futures: list[Future] = [executor.submit(TeamList._parse_part, part, self._parser) for part in parts]
+        teams: list[Team] = [Team.from_record(record) for future in futures for record in future.result()]
+        teams.sort(key=Team.get_sort_key)
         return teams
 
     ############################################################################
@@ -95,46 +151,72 @@ class TeamList:
         Retrieve website via cache
         """
         # Get website content from cache handler
-        cache: WebSiteCache = WebSiteCache(self._listname, self._url, self._cachetime, self._useragent)
-        return cache.get_website_from_cache()
+        return self.get_cache().get_website_from_cache()
 
     ############################################################################
     def find_team(self: object, episode: Episode) -> Team:
         """
         Find team in list
         """
-        # Create empty team
-        team: Team = Team()
-        # Loop over all teams
-        for current_team in self._teams:
-            # Does episode match team
-            if current_team.matches(episode):
-                # Memorize team and abort loop
-                team = current_team
-                break
+        # Lookup episode in index of teams
+        team: Team = self._index.find(episode)
 
         # Check team for logging data
         if team.empty:
-            logging.info("no match for episode [{}]".format(episode))
+            logging.info("no match for episode [%s]", episode)
         else:
-            logging.debug("episode [{}] matches team [{}]".format(episode, team))
+            logging.debug("episode [%s] matches team [%s]", episode, team)
 
         # Return either empty team or found team
         return team
 
+    ############################################################################
+    def find_teams(self: object, episodes: list[Episode]) -> list[Team]:
+        """
+        Find teams of all episodes in one pass, equal episodes are resolved once
+        """
+        teams: list[Team] = []
+        resolved: dict[tuple[int, str], Team] = {}
+        for episode in episodes:
+            key: tuple[int, str] = (episode.episode_year, episode.episode_inspectors)
+            if key not in resolved:
+                resolved[key] = self.find_team(episode)
+            teams.append(resolved[key])
+        return teams
+
     ############################################################################
     def get_team_count(self: object) -> int:
         return len(self._teams)
 
     ############################################################################
-    def get_teams(self: object) -> None:
+    def get_cache(self: object) -> WebSiteCache:
         """
-        Read website and extract teams, return them as list.
+        Cache handler of website, e.g. to prefetch the content
+        """
+        return WebSiteCache(self._listname, self._url, self._cachetime, self._useragent, self._fetcher, self._cachedir, self._compression, self._stale, self._maxstale)
+
+    ############################################################################
+    def get_teams(self: object, websitecontent: str = None, executor: Executor = None) -> None:
+        """
+        Read website, unless the content was already prefetched, and extract teams, return them as list.
+        Parts of the website are parsed by the worker processes of the executor when given.
         """
         # Get website content
-        websitecontent: str = self._read_website()
-        # Parse website
-        self._teams = self._parse_website(websitecontent)
+        if websitecontent is None:
+            websitecontent = self._read_website()
+        # Use snapshot of parsed teams when website content is unchanged, the
+        # end of running periods depends on the current year
+        snapshot: SnapshotCache = SnapshotCache(os.path.join(self._cachedir, self._listname))
+        contenthash: str = SnapshotCache.get_hash(websitecontent, date.today().year)
+        records: list[tuple] = snapshot.load(contenthash)
+        if records is None:
+            # Parse website
+            self._teams = self._parse_website(websitecontent, executor)
+            snapshot.save(contenthash, [team.get_record() for team in self._teams])
+        else:
+            self._teams = [Team.from_record(record) for record in records]
+        # Build index for matching episodes
+        self._index = TeamIndex(self._teams)
         # for curteam in self._teams:
         #     logging.debug("{}".format(curteam))
         logging.info("total number of teams [{}]".format(len(self._teams)))
@@ -24,9 +24,11 @@ SOFTWARE.
 ******************************************************************************
 """
 
-import fnmatch
+import heapq
 import logging
 import os
+import re
+import threading
 import time
 import datetime
 from pathlib import Path
@@ -35,9 +37,13 @@ from taren.helper import Helper
 
 class Trash:
     """
-    Handling of trash bucket
+    Handling of trash bucket. The content of the trash folder is read once into
+    an index, all operations work on this index.
     """
 
+    # Name of a variant, e.g. 'name_2.mp4'
+    _regex_variant: re.Pattern = re.compile(r"^(.*)_([0-9]+)(\.[^.]*)?$")
+
     ############################################################################
     def __init__(self: object, basedir: str, trash: str, trashage: int, trashignore: str) -> None:
         """
@@ -49,12 +55,63 @@ class Trash:
         self._trashignore: str = trashignore
         self._trashfolder: str = os.path.join(self._basedir, self._trash)
         self._trashignorefile: str = os.path.join(self._trashfolder, self._trashignore)
+        self._lock: threading.Lock = threading.Lock()
+        # Files in trash, normalized name to real name and modification time
+        self._files: dict[str, tuple[str, float]] = {}
+        # Next free variant number by normalized base name
+        self._variants: dict[str, int] = {}
+        # Files by time of deletion
+        self._deletions: list[tuple[float, str]] = []
+        # Number of syscalls by name
+        self._syscalls: dict[str, int] = {}
         logging.debug("basedir [{}]".format(self._basedir))
         logging.debug("trash [{}]".format(self._trash))
         logging.debug("trashage [{}]".format(self._trashage))
         logging.debug("trashfolder [{}]".format(self._trashfolder))
         logging.debug("trashignore [{}]".format(self._trashignorefile))
 
+    ############################################################################
+    def _add_to_index(self: object, filename: str, mtime: float) -> None:
+        """
+        Add file to index, caller holds the lock
+        """
+        key: str = os.path.normcase(filename)
+        self._files[key] = (filename, mtime)
+        heapq.heappush(self._deletions, (mtime + self._trashage * 86400, key))
+        # File is a variant of itself and maybe of a shorter base name
+        stem, extension = os.path.splitext(key)
+        self._variants[key] = max(self._variants.get(key, 0), 1)
+        variant_match: re.Match = Trash._regex_variant.search(key)
+        if variant_match:
+            base: str = variant_match.group(1) + (variant_match.group(3) or "")
+            self._variants[base] = max(self._variants.get(base, 0), int(variant_match.group(2)) + 1)
+
+    ############################################################################
+    def _count(self: object, name: str, count: int = 1) -> None:
+        """
+        Count syscall, caller holds the lock
+        """
+        self._syscalls[name] = self._syscalls.get(name, 0) + count
+
+    ############################################################################
+    def _load_index(self: object) -> None:
+        """
+        Read content of trash folder once
+        """
+        with self._lock:
+            self._files = {}
+            self._variants = {}
+            self._deletions = []
+            ignorekey: str = os.path.normcase(self._trashignore)
+            with os.scandir(self._trashfolder) as entries:
+                for entry in entries:
+                    if not entry.is_file() or os.path.normcase(entry.name) == ignorekey:
+                        continue
+                    self._add_to_index(entry.name, entry.stat().st_mtime)
+                    self._count("stat")
+            self._count("scandir")
+        logging.debug("files in trash [{}]".format(len(self._files)))
+
     ############################################################################
     def cleanup(self: object) -> int:
         """
@@ -64,31 +121,57 @@ class Trash:
         if os.path.exists(self._trashignorefile):
             Helper.delete_file(self._trashignorefile)
         deleted: int = 0
-        # Calculate maximum age
-        maxage: int = time.time() - self._trashage * 86400
+        now: float = time.time()
         logging.info("Delete files older than [{}] days from trash [{}]".format(self._trashage, self._trashfolder))
-        # Loop over all in trash
-        for filename in os.listdir(self._trashfolder):
-            # Build FQN
-            fname: str = os.path.join(self._trashfolder, filename)
-            # Check only files
-            if os.path.isfile(fname):
-                # Check age of file
-                if os.path.getmtime(fname) < maxage:
+        with self._lock:
+            # Only files with an expired time of deletion are touched
+            while self._deletions and self._deletions[0][0] < now:
+                deletion, key = heapq.heappop(self._deletions)
+                entry: tuple[str, float] = self._files.get(key)
+                if entry is None or entry[1] + self._trashage * 86400 != deletion:
+                    # Outdated entry of heap
+                    continue
+                filename: str = entry[0]
+                del self._files[key]
+                self._count("remove")
+                try:
                     # Perform deletion
-                    Helper.delete_file(fname)
-                    logging.info("Delete file [{}]".format(filename))
-                    deleted = deleted + 1
+                    Helper.delete_file(os.path.join(self._trashfolder, filename))
+                except FileNotFoundError:
+                    logging.warning("File [%s] already deleted", filename)
+                    continue
+                logging.info("Delete file [%s]", filename)
+                deleted = deleted + 1
         # Create ignore file for media server
         Path(self._trashignorefile).touch()
         return deleted
 
+    ############################################################################
+    def get_folder(self: object) -> str:
+        """
+        Folder of trash
+        """
+        return self._trashfolder
+
+    ############################################################################
+    def get_syscalls(self: object) -> dict[str, int]:
+        """
+        Number of syscalls by name since last call, counter is reset
+        """
+        with self._lock:
+            syscalls: dict[str, int] = self._syscalls
+            self._syscalls = {}
+        return syscalls
+
     ############################################################################
     def init(self: object) -> bool:
         """
-        Ensure existence of the trash folder
+        Ensure existence of the trash folder and read its content
         """
-        return Helper.ensureDirectory(self._trashfolder)
+        if not Helper.ensureDirectory(self._trashfolder):
+            return False
+        self._load_index()
+        return True
 
     ############################################################################
     def list(self: object) -> int:
@@ -97,54 +180,56 @@ class Trash:
         """
         logging.info("List files from trash [{}]".format(self._trashfolder))
         today: datetime = datetime.datetime.today()
-        filesintrash: int = 0
-        # Loop over all in trash
-        for filename in os.listdir(self._trashfolder):
-            # Build FQN
-            fname: str = os.path.join(self._trashfolder, filename)
-            # Check only files
-            if os.path.isfile(fname):
-                # Ignore marker for media servers
-                if fname == self._trashignorefile:
-                    continue
-                # List file
-                file_mod_time: datetime = datetime.datetime.fromtimestamp(os.path.getmtime(fname))
-                age: datetime = today - file_mod_time
-                logging.info("File [{}|{:02d}]".format(filename, age.days))
-                filesintrash += 1
-        return filesintrash
+        with self._lock:
+            entries: list[tuple[str, float]] = sorted(self._files.values())
+        for filename, mtime in entries:
+            # List file
+            file_mod_time: datetime = datetime.datetime.fromtimestamp(mtime)
+            age: datetime = today - file_mod_time
+            logging.info("File [%s|%02d]", filename, age.days)
+        return len(entries)
 
     ############################################################################
-    def move(self: object, file: str) -> None:
+    def move(self: object, file: str) -> str:
         """
-        Move file to trash and modify file date to deletion timestamp
+        Move file to trash and modify file date to deletion timestamp, return
+        name of file in trash
         """
 
         # Extract plain filename and extension from source file
         filenameWithPath, fileExtension = os.path.splitext(file)
         filenameRaw: str = os.path.basename(filenameWithPath)
 
-        logging.debug("File [{}] splittet into [{}] and [{}]".format(file, filenameRaw, fileExtension))
-
-        # Build search mask for variants
-        searchmask: str = filenameRaw + "*" + fileExtension
-        logging.debug("Searchmask [{}]".format(searchmask))
-
-        # Search for existing variants
-        dst: str = ""
-        dstVariants: list[str] = fnmatch.filter(os.listdir(self._trashfolder), searchmask)
-        if 0 == len(dstVariants):
-            dst = os.path.join(self._trashfolder, (filenameRaw + fileExtension))
-        else:
-            dst = os.path.join(self._trashfolder, (filenameRaw + "_" + str(len(dstVariants)) + fileExtension))
+        logging.debug("File [%s] splittet into [%s] and [%s]", file, filenameRaw, fileExtension)
+
+        # Reserve free name of variant, the lock avoids equal names in parallel moves
+        with self._lock:
+            base: str = os.path.normcase(filenameRaw + fileExtension)
+            variant: int = self._variants.get(base, 0)
+            filename: str = filenameRaw + fileExtension
+            while os.path.normcase(filename) in self._files:
+                variant = max(variant, 1)
+                filename = filenameRaw + "_" + str(variant) + fileExtension
+                variant += 1
+            self._variants[base] = max(variant, 1)
+            now: float = time.time()
+            self._add_to_index(filename, now)
+            self._count("rename")
+            self._count("utime")
 
         # Build destination name
-        dst: str = os.path.join(self._trashfolder, dst)
+        dst: str = os.path.join(self._trashfolder, filename)
 
         # Move file to trash
-        logging.debug("Move file [{}] to [{}]".format(file, dst))
-        os.rename(file, dst)
+        logging.debug("Move file [%s] to [%s]", file, dst)
+        try:
+            os.rename(file, dst)
+        except OSError:
+            with self._lock:
+                del self._files[os.path.normcase(filename)]
+            raise
+
         # Modify timestamp
-        now: float = time.time()
-        logging.debug("Set access/modified timestamp of [{}] to [{}]".format(dst, now))
+        logging.debug("Set access/modified timestamp of [%s] to [%s]", dst, now)
         os.utime(dst, (now, now))
+        return dst
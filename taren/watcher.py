@@ -0,0 +1,145 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+import logging
+import sqlite3
+import time
+
+import requests
+
+from taren.download import Download
+from taren.downloadlist import DownloadList
+from taren.stats import Stats
+from taren.taren import TaRen
+
+
+class Watcher:
+    """
+    Long running mode: poll the downloads folder and rename new downloads as
+    soon as they are completed. Episodes and teams are kept in memory.
+    """
+
+    # Transient errors of a poll, e.g. network, file system or state database
+    _errors: tuple[type] = (requests.RequestException, OSError, ValueError, sqlite3.Error)
+
+    ############################################################################
+    def __init__(self: object, taren: TaRen, interval: float, debounce: float, reload: float) -> None:
+        """
+        Default init of variables
+        """
+        self._taren: TaRen = taren
+        self._interval: float = interval
+        self._debounce: float = debounce
+        self._reload: float = reload
+        # Downloads already handled, FQN to (size, mtime)
+        self._done: dict[str, tuple[int, float]] = {}
+        # Downloads in progress, FQN to (size, mtime) and time of last change
+        self._pending: dict[str, tuple[tuple[int, float], float]] = {}
+        self._loaded: float = 0.0
+        logging.debug("interval [{}]".format(self._interval))
+        logging.debug("debounce [{}]".format(self._debounce))
+        logging.debug("reload [{}]".format(self._reload))
+
+    ############################################################################
+    def _get_state(self: object, download: Download) -> tuple[int, float]:
+        """
+        Size and modification time, changes while download is written
+        """
+        return (download.size, download.mtime)
+
+    ############################################################################
+    def _mark_done(self: object, download_list: DownloadList) -> None:
+        """
+        Remember all current downloads as handled, except those still written
+        """
+        self._done = {download.get_fqn(): self._get_state(download) for download in download_list.get_downloads() if download.get_fqn() not in self._pending}
+
+    ############################################################################
+    def poll(self: object) -> Stats:
+        """
+        List downloads once and rename all downloads which did not change for
+        the debounce time. Return statistics or None if nothing was completed.
+        """
+        now: float = time.monotonic()
+        if now - self._loaded > self._reload:
+            # Refresh episodes and teams from cache, check all downloads again
+            self._loaded = now
+            try:
+                self._taren.load_catalogs()
+                self._done = {}
+            except Watcher._errors:
+                # Keep the loaded lists until the next reload
+                logging.exception("reload of episodes and teams failed")
+
+        download_list: DownloadList = self._taren.get_download_list()
+        completed: list[Download] = []
+        pending: dict[str, tuple[tuple[int, float], float]] = {}
+        for download in download_list.get_downloads():
+            fqn: str = download.get_fqn()
+            state: tuple[int, float] = self._get_state(download)
+            if self._done.get(fqn) == state:
+                continue
+            last_state, last_change = self._pending.get(fqn, (None, now))
+            if last_state != state:
+                # New or still growing download
+                pending[fqn] = (state, now)
+                continue
+            if now - last_change < self._debounce:
+                pending[fqn] = (state, last_change)
+                continue
+            completed.append(download)
+        self._pending = pending
+
+        if 0 == len(completed):
+            return None
+
+        logging.info("completed downloads [{}]".format(len(completed)))
+        statistics: Stats = self._taren.rename_downloads(download_list, completed)
+        self._taren.cleanup_trash(statistics)
+        self._mark_done(download_list)
+        logging.info("summary: {}".format(statistics))
+        self._taren.export_stats(statistics)
+        return statistics
+
+    ############################################################################
+    def run(self: object) -> None:
+        """
+        Watch downloads folder until interrupted, episodes and teams are already
+        loaded by the initial run
+        """
+        self._loaded = time.monotonic()
+        self._mark_done(self._taren.get_download_list())
+        logging.info("watching for new downloads")
+        try:
+            while True:
+                time.sleep(self._interval)
+                try:
+                    self.poll()
+                except Watcher._errors:
+                    # Keep watching, the next poll tries again
+                    logging.exception("poll of downloads failed")
+        except KeyboardInterrupt:
+            logging.info("stop watching for new downloads")
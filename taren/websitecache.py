@@ -26,30 +26,76 @@ SOFTWARE.
 
 import codecs
 import datetime
+import gzip
+import hashlib
+import json
 import logging
+import mmap
 import os
+import threading
+import time
+import zlib
 
 import requests
 
 from taren.helper import Helper
+from taren.websitefetcher import WebSiteFetcher
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 
 class WebSiteCache:
     """
-    Simple file cache for websites
+    Simple file cache for websites. The content is stored with a header line
+    containing the compression and the SHA-256 hash of the content, followed by
+    the content itself, either plain or compressed. Outdated content can be
+    served while it is refreshed in the background.
     """
 
+    # Identifies a cache file and version of its layout
+    _magic: bytes = b"TAREN-CACHE 1"
+    # Supported compressions
+    _compressions: tuple[str] = ("none", "gzip", "zstd")
+    # Size of chunks for downloading and copying
+    _chunksize: int = 65536
+    # Running background refreshes by cache file
+    _refreshes: dict[str, threading.Thread] = {}
+    _refreshes_lock: threading.Lock = threading.Lock()
+
     ############################################################################
-    def __init__(self: object, cachename: str, websiteurl: str, cacheage: int, useragent: str) -> None:
+    def __init__(self: object, cachename: str, websiteurl: str, cacheage: int, useragent: str, fetcher: WebSiteFetcher = None, cachedir: str = ".", compression: str = "none", stale: bool = False, maxstale: int = None) -> None:
         """
         Default init of variables
         """
         self._cacheage: int = cacheage
-        self._cachename: str = "{}.html".format(cachename)
+        self._cachedir: str = cachedir
+        self._cachename: str = os.path.join(cachedir, "{}.cache".format(cachename))
+        self._metaname: str = os.path.join(cachedir, "{}.meta".format(cachename))
+        self._partname: str = os.path.join(cachedir, "{}.part".format(cachename))
+        self._partmetaname: str = os.path.join(cachedir, "{}.part.meta".format(cachename))
         self._websiteurl: str = websiteurl
         self._useragent: str = useragent
+        self._compression: str = compression
+        self._stale: bool = stale
+        self._maxstale: int = maxstale
+        if self._compression not in WebSiteCache._compressions:
+            logging.warning("unknown compression [{}], store cache uncompressed".format(self._compression))
+            self._compression = "none"
+        if "zstd" == self._compression and zstandard is None:
+            logging.warning("module zstandard not available, use gzip compression")
+            self._compression = "gzip"
+        self._fetcher: WebSiteFetcher = fetcher
+        if self._fetcher is None:
+            self._fetcher = WebSiteFetcher(self._useragent)
         logging.debug("cache file [{}]".format(self._cachename))
+        logging.debug("meta file [{}]".format(self._metaname))
         logging.debug("cacheage [{}]".format(self._cacheage))
+        logging.debug("compression [{}]".format(self._compression))
+        logging.debug("stale [{}]".format(self._stale))
+        logging.debug("maxstale [{}]".format(self._maxstale))
         logging.debug("websiteurl [{}]".format(self._websiteurl))
         logging.debug("useragent [{}]".format(self._useragent))
 
@@ -66,38 +112,299 @@ class WebSiteCache:
         logging.info("cache file [{}] aged [{}] days, maxage [{}] days".format(self._cachename, cacheage, self._cacheage))
         return cacheage
 
+    ############################################################################
+    def _read_metadata(self: object) -> dict:
+        """
+        Read validators (ETag, Last-Modified) of cached file from sidecar file
+        """
+        metadata: dict = {}
+        if os.path.exists(self._metaname):
+            try:
+                with codecs.open(self._metaname, "r", "utf-8") as file:
+                    metadata = json.load(file)
+            except (OSError, ValueError):
+                logging.warning("cannot read meta file [{}], ignore it".format(self._metaname))
+        return metadata
+
+    ############################################################################
+    @staticmethod
+    def _decompress(compression: str, data: memoryview) -> bytes:
+        """
+        Decompress content of cache file, plain content is returned as it is.
+        Raise ValueError for broken or unsupported content.
+        """
+        errors: tuple = (EOFError, OSError, zlib.error)
+        if zstandard is not None:
+            errors = errors + (zstandard.ZstdError,)
+        try:
+            if "none" == compression:
+                return data
+            if "gzip" == compression:
+                return gzip.decompress(data)
+            if "zstd" == compression and zstandard is not None:
+                return zstandard.ZstdDecompressor().decompress(data)
+        except errors as exception:
+            raise ValueError("cannot decompress content [{}]".format(exception))
+        raise ValueError("unsupported compression [{}]".format(compression))
+
     ############################################################################
     def _read_from_cache(self: object) -> str:
         """
-        Read content from cached file
+        Read content from cached file using a memory map, plain content is
+        decoded directly from the map. Raise ValueError for a broken file.
         """
-        with codecs.open(self._cachename, "r", "utf-8") as file:
-            websitecontent: str = file.read()
+        with open(self._cachename, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            headerend: int = content.find(b"\n")
+            header: list[bytes] = content[:headerend].split(b" ") if 0 <= headerend else []
+            if 4 != len(header) or WebSiteCache._magic != b" ".join(header[:2]):
+                raise ValueError("invalid header")
+            compression: str = header[2].decode("ascii")
+            with memoryview(content)[headerend + 1 :] as data:
+                websitecontent: bytes = self._decompress(compression, data)
+                if header[3].decode("ascii") != hashlib.sha256(websitecontent).hexdigest():
+                    raise ValueError("hash mismatch")
+                text: str = str(websitecontent, "utf-8")
+                del websitecontent
         logging.info("read content from cache file [{}]".format(self._cachename))
-        return websitecontent
+        return text
+
+    ############################################################################
+    def _write_metadata(self: object, response: requests.Response) -> None:
+        """
+        Write validators (ETag, Last-Modified) of response to sidecar file
+        """
+        metadata: dict = {}
+        if "ETag" in response.headers:
+            metadata["etag"] = response.headers["ETag"]
+        if "Last-Modified" in response.headers:
+            metadata["last_modified"] = response.headers["Last-Modified"]
+        with codecs.open(self._metaname, "w", "utf-8") as file:
+            json.dump(metadata, file)
+
+    ############################################################################
+    def _read_partial(self: object) -> dict:
+        """
+        Read validators of a partial download, empty if it cannot be resumed
+        """
+        if not os.path.exists(self._partname) or not os.path.exists(self._partmetaname):
+            return {}
+        try:
+            with codecs.open(self._partmetaname, "r", "utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    ############################################################################
+    def _write_partial(self: object, response: requests.Response) -> None:
+        """
+        Remember validators of download to resume it. Downloads with content
+        encoding or without validator cannot be resumed.
+        """
+        validator: str = response.headers.get("ETag", response.headers.get("Last-Modified"))
+        if validator is None or response.headers.get("Content-Encoding", "identity") != "identity":
+            if os.path.exists(self._partmetaname):
+                os.remove(self._partmetaname)
+            return
+        with codecs.open(self._partmetaname, "w", "utf-8") as file:
+            json.dump({"validator": validator}, file)
+
+    ############################################################################
+    def _remove_partial(self: object) -> None:
+        """
+        Remove partial download and its validators
+        """
+        for filename in [self._partname, self._partmetaname]:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    ############################################################################
+    @staticmethod
+    def _get_expected_size(response: requests.Response, offset: int) -> int:
+        """
+        Complete size of the content, None if unknown
+        """
+        if response.headers.get("Content-Encoding", "identity") != "identity":
+            return None
+        contentrange: str = response.headers.get("Content-Range", "")
+        if 206 == response.status_code and "/" in contentrange and not contentrange.endswith("/*"):
+            return int(contentrange.rsplit("/", 1)[1])
+        if "Content-Length" in response.headers:
+            return offset + int(response.headers["Content-Length"])
+        return None
+
+    ############################################################################
+    def _store_partial(self: object) -> None:
+        """
+        Validate completed download and write it as cache file, the cache file
+        is replaced atomically
+        """
+        # Content has to be valid UTF-8, hash is part of the header
+        contenthash = hashlib.sha256()
+        decoder: codecs.IncrementalDecoder = codecs.getincrementaldecoder("utf-8")()
+        with open(self._partname, "rb") as file:
+            for chunk in iter(lambda: file.read(WebSiteCache._chunksize), b""):
+                contenthash.update(chunk)
+                decoder.decode(chunk)
+        decoder.decode(b"", True)
+
+        header: bytes = b" ".join([WebSiteCache._magic, self._compression.encode("ascii"), contenthash.hexdigest().encode("ascii")])
+        tempname: str = "{}.tmp".format(self._cachename)
+        with open(self._partname, "rb") as source, open(tempname, "wb") as file:
+            file.write(header + b"\n")
+            if "gzip" == self._compression:
+                writer = gzip.GzipFile(fileobj=file, mode="wb", mtime=0)
+            elif "zstd" == self._compression:
+                writer = zstandard.ZstdCompressor().stream_writer(file, size=os.path.getsize(self._partname), closefd=False)
+            else:
+                writer = file
+            for chunk in iter(lambda: source.read(WebSiteCache._chunksize), b""):
+                writer.write(chunk)
+            if writer is not file:
+                writer.close()
+        os.replace(tempname, self._cachename)
 
     ############################################################################
-    def _write_to_cache(self: object) -> None:
+    def _write_to_cache(self: object, revalidate: bool = True) -> None:
         """
-        Write downloaded content to cache file
+        Stream downloaded content to a partial file and write the cache file
+        from it. An interrupted download is resumed, an existing cache file is
+        revalidated, on HTTP 304 only the timestamp of the cache file is renewed.
         """
-        headers = {"User-Agent": self._useragent}
-        websitecontent: bytes = requests.get(self._websiteurl, headers=headers).content
-        with codecs.open(self._cachename, "w", "utf-8") as file:
-            file.write(websitecontent.decode("utf-8"))
+        if not Helper.ensureDirectory(self._cachedir):
+            raise OSError("cannot create cache folder [{}]".format(self._cachedir))
+        # Without content encoding ranges refer to the stored bytes, so the download can be resumed
+        headers: dict = {"User-Agent": self._useragent, "Accept-Encoding": "identity"}
+        partial: dict = self._read_partial()
+        offset: int = 0
+        if "validator" in partial:
+            # Resume download, the server sends all content when it changed
+            offset = os.path.getsize(self._partname)
+            headers["Range"] = "bytes={}-".format(offset)
+            headers["If-Range"] = partial["validator"]
+        elif revalidate and os.path.exists(self._cachename):
+            metadata: dict = self._read_metadata()
+            if "etag" in metadata:
+                headers["If-None-Match"] = metadata["etag"]
+            if "last_modified" in metadata:
+                headers["If-Modified-Since"] = metadata["last_modified"]
+        with self._fetcher.get(self._websiteurl, headers, True) as response:
+            if 304 == response.status_code:
+                now: float = time.time()
+                os.utime(self._cachename, (now, now))
+                logging.info("content of [{}] not modified, renewed cache file [{}]".format(self._websiteurl, self._cachename))
+                return
+            if 416 == response.status_code and 0 < offset:
+                # Range not satisfiable, start again
+                logging.warning("cannot resume download of [{}], start again".format(self._websiteurl))
+                self._remove_partial()
+                self._write_to_cache(revalidate)
+                return
+            response.raise_for_status()
+            if 206 != response.status_code:
+                offset = 0
+            elif 0 < offset:
+                logging.info("resume download of [{}] at [{}] bytes".format(self._websiteurl, offset))
+            self._write_partial(response)
+            with open(self._partname, "ab" if 0 < offset else "wb") as file:
+                for chunk in response.iter_content(WebSiteCache._chunksize):
+                    file.write(chunk)
+        expected: int = self._get_expected_size(response, offset)
+        if expected is not None and expected != os.path.getsize(self._partname):
+            raise OSError("incomplete download of [{}], [{}] of [{}] bytes".format(self._websiteurl, os.path.getsize(self._partname), expected))
+        try:
+            self._store_partial()
+        except ValueError:
+            # Broken content cannot be resumed
+            self._remove_partial()
+            raise
+        self._write_metadata(response)
+        self._remove_partial()
         logging.info("saved content of [{}] to cache file [{}]".format(self._websiteurl, self._cachename))
 
+    ############################################################################
+    def _refresh_quietly(self: object) -> None:
+        """
+        Refresh cache file, failures are only logged
+        """
+        try:
+            self._write_to_cache()
+        except (requests.RequestException, OSError, ValueError) as exception:
+            logging.warning("refresh of cache file [{}] failed [{}]".format(self._cachename, exception))
+
+    ############################################################################
+    def _refresh_in_background(self: object) -> None:
+        """
+        Start refresh of cache file in a separate thread, unless already running
+        """
+        with WebSiteCache._refreshes_lock:
+            thread: threading.Thread = WebSiteCache._refreshes.get(self._cachename)
+            if thread is not None and thread.is_alive():
+                return
+            thread = threading.Thread(target=self._refresh_quietly, name="refresh {}".format(self._cachename))
+            WebSiteCache._refreshes[self._cachename] = thread
+            thread.start()
+        logging.info("refresh cache file [{}] in background".format(self._cachename))
+
+    ############################################################################
+    def _wait_for_refresh(self: object) -> None:
+        """
+        Wait until background refresh of cache file is done
+        """
+        with WebSiteCache._refreshes_lock:
+            thread: threading.Thread = WebSiteCache._refreshes.get(self._cachename)
+        if thread is not None:
+            thread.join()
+
+    ############################################################################
+    @staticmethod
+    def wait_for_refreshes() -> None:
+        """
+        Wait until all background refreshes are done, e.g. before exit
+        """
+        with WebSiteCache._refreshes_lock:
+            threads: list[threading.Thread] = list(WebSiteCache._refreshes.values())
+        for thread in threads:
+            thread.join()
+
+    ############################################################################
+    def refresh(self: object) -> None:
+        """
+        Revalidate cache file with the website regardless of its age
+        """
+        self._write_to_cache()
+
     ############################################################################
     def get_website_from_cache(self: object) -> str:
         """
-        First check cache file, if creation age is greater than given limit, then remove
-        cache file. If cache file does not exist, retrieve website content and save to
-        cache file. Retrieve content from cache file. Return content.
+        First check cache file, if creation age is greater than given limit, then
+        revalidate cache file with the website. If cache file does not exist,
+        retrieve website content and save to cache file. Retrieve content from
+        cache file. Return content.
+        Outdated content is served as long as it is not older than the hard
+        limit: in stale mode while refreshing in the background, otherwise
+        when the website cannot be retrieved.
         """
-        if self._get_age_in_days() > self._cacheage:
-            Helper.delete_file(self._cachename)
-            logging.info("deleted cache file [{}]".format(self._cachename))
         if not os.path.exists(self._cachename):
             self._write_to_cache()
-        content: str = self._read_from_cache()
+        else:
+            cacheage: int = self._get_age_in_days()
+            if cacheage > self._cacheage:
+                servable: bool = self._maxstale is None or cacheage <= self._maxstale
+                if self._stale and servable:
+                    self._refresh_in_background()
+                else:
+                    try:
+                        self._write_to_cache()
+                    except (requests.RequestException, OSError, ValueError) as exception:
+                        if not servable:
+                            raise
+                        logging.warning("cannot refresh cache file [{}] [{}], use outdated content".format(self._cachename, exception))
+        try:
+            content: str = self._read_from_cache()
+        except ValueError as exception:
+            # Broken cache file, download content again
+            logging.warning("cache file [{}] is broken [{}], download again".format(self._cachename, exception))
+            self._wait_for_refresh()
+            self._write_to_cache(False)
+            content = self._read_from_cache()
         return content
@@ -0,0 +1,92 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class WebSiteFetcher:
+    """
+    Pooled HTTP session with timeout and retry/backoff, used to download
+    all websites concurrently
+    """
+
+    ############################################################################
+    def __init__(self: object, useragent: str, timeout: float = 30.0, retries: int = 3, backoff: float = 1.0) -> None:
+        """
+        Setup session with connection pool and retry handling
+        """
+        self._timeout: float = timeout
+        retry: Retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=frozenset(["GET"]))
+        adapter: HTTPAdapter = HTTPAdapter(max_retries=retry)
+        self._session: requests.Session = requests.Session()
+        self._session.headers["User-Agent"] = useragent
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        logging.debug("useragent [{}]".format(useragent))
+        logging.debug("timeout [{}]".format(timeout))
+        logging.debug("retries [{}]".format(retries))
+        logging.debug("backoff [{}]".format(backoff))
+
+    ############################################################################
+    def get(self: object, url: str, headers: dict = None, stream: bool = False) -> requests.Response:
+        """
+        Perform GET request using the pooled session, with stream the body is
+        read on demand
+        """
+        return self._session.get(url, headers=headers, timeout=self._timeout, stream=stream)
+
+    ############################################################################
+    def prefetch(self: object, caches: dict[str, object]) -> dict[str, str]:
+        """
+        Retrieve content of all given website caches concurrently
+        """
+        contents: dict[str, str] = {}
+        if 0 == len(caches):
+            return contents
+        with ThreadPoolExecutor(max_workers=len(caches)) as executor:
+            futures: dict[str, Future] = {name: executor.submit(cache.get_website_from_cache) for name, cache in caches.items()}
+            for name, future in futures.items():
+                contents[name] = future.result()
+        logging.info("prefetched [{}] websites".format(len(contents)))
+        return contents
+
+    ############################################################################
+    def refresh(self: object, caches: dict[str, object]) -> None:
+        """
+        Revalidate all given website caches concurrently regardless of their age
+        """
+        if 0 == len(caches):
+            return
+        with ThreadPoolExecutor(max_workers=len(caches)) as executor:
+            futures: list[Future] = [executor.submit(cache.refresh) for cache in caches.values()]
+            for future in futures:
+                future.result()
+        logging.info("refreshed [{}] websites".format(len(caches)))
@@ -0,0 +1,75 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+import logging
+import unittest
+
+from taren.ratelimitfilter import RateLimitFilter
+
+
+class TestRateLimitFilter(unittest.TestCase):
+    """
+    Tests of the rate limit of log records
+    """
+
+    ############################################################################
+    def _record(self: object, msg: str, args: tuple, created: float) -> logging.LogRecord:
+        """
+        Create record of the same call site at the given time
+        """
+        record: logging.LogRecord = logging.LogRecord("root", logging.INFO, "taren.py", 42, msg, args, None)
+        record.created = created
+        return record
+
+    ############################################################################
+    def test_suppressed_count_with_percent_in_message(self: object) -> None:
+        """
+        Count of suppressed records is added to a message which is formatted already
+        """
+        limit: RateLimitFilter = RateLimitFilter(1, 60.0)
+        message: str = "downloads with equal content [Tatort 100% - 1.mp4]"
+        self.assertTrue(limit.filter(self._record(message, (), 0.0)))
+        self.assertFalse(limit.filter(self._record(message, (), 1.0)))
+        self.assertFalse(limit.filter(self._record(message, (), 2.0)))
+        record: logging.LogRecord = self._record(message, (), 61.0)
+        self.assertTrue(limit.filter(record))
+        self.assertEqual("{} (suppressed [2] similar messages)".format(message), record.getMessage())
+
+    ############################################################################
+    def test_suppressed_count_with_arguments(self: object) -> None:
+        """
+        Arguments of the record are applied before the count is added
+        """
+        limit: RateLimitFilter = RateLimitFilter(1, 60.0)
+        self.assertTrue(limit.filter(self._record("rename [%s]", ("a",), 0.0)))
+        self.assertFalse(limit.filter(self._record("rename [%s]", ("b",), 1.0)))
+        record: logging.LogRecord = self._record("rename [%s]", ("c",), 61.0)
+        self.assertTrue(limit.filter(record))
+        self.assertEqual("rename [c] (suppressed [1] similar messages)", record.getMessage())
+
+
+if __name__ == "__main__":
+    unittest.main()
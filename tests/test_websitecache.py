@@ -0,0 +1,132 @@
+"""
+******************************************************************************
+Copyright 2020 ThirtySomething
+******************************************************************************
+This file is part of TaRen.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+******************************************************************************
+"""
+
+import http.server
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from taren.websitecache import WebSiteCache
+from taren.websitefetcher import WebSiteFetcher
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """
+    Stand-in for the website, answers conditional requests with HTTP 304
+    """
+
+    body: bytes = "<table><tr><td>Taxi nach Leipzig</td></tr></table>".encode("utf-8")
+    etag: str = '"v1"'
+    statuses: list[int] = []
+
+    ############################################################################
+    def do_GET(self: object) -> None:
+        """
+        Send content, or HTTP 304 when the client has the current version
+        """
+        if self.headers.get("If-None-Match") == _Handler.etag:
+            _Handler.statuses.append(304)
+            self.send_response(304)
+            self.send_header("ETag", _Handler.etag)
+            self.end_headers()
+            return
+        _Handler.statuses.append(200)
+        self.send_response(200)
+        self.send_header("ETag", _Handler.etag)
+        self.send_header("Content-Length", str(len(_Handler.body)))
+        self.end_headers()
+        self.wfile.write(_Handler.body)
+
+    ############################################################################
+    def log_message(self: object, format: str, *args: object) -> None:
+        """
+        Keep output of tests clean
+        """
+
+
+class TestWebSiteCache(unittest.TestCase):
+    """
+    Tests of the revalidation of the cache file against a local HTTP server
+    """
+
+    ############################################################################
+    def setUp(self: object) -> None:
+        """
+        Start local HTTP server and create empty cache folder
+        """
+        _Handler.statuses = []
+        self._server: http.server.ThreadingHTTPServer = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self._url: str = "http://127.0.0.1:{}/Liste_der_Tatort-Folgen".format(self._server.server_port)
+        self._cachedir: str = tempfile.mkdtemp(prefix="taren-test-")
+
+    ############################################################################
+    def tearDown(self: object) -> None:
+        """
+        Stop server and remove cache folder
+        """
+        self._server.shutdown()
+        self._server.server_close()
+        shutil.rmtree(self._cachedir, ignore_errors=True)
+
+    ############################################################################
+    def _get_cache(self: object) -> WebSiteCache:
+        """
+        Cache which is outdated after one day
+        """
+        return WebSiteCache("Tatort", self._url, 1, "TaRen test", WebSiteFetcher("TaRen test", 5.0, 0, 0.0), self._cachedir, "gzip")
+
+    ############################################################################
+    def test_revalidate_not_modified(self: object) -> None:
+        """
+        First request downloads the content, an outdated cache file is only
+        renewed when the server answers HTTP 304
+        """
+        content: str = self._get_cache().get_website_from_cache()
+        self.assertEqual(_Handler.body.decode("utf-8"), content)
+        self.assertEqual([200], _Handler.statuses)
+
+        cachename: str = os.path.join(self._cachedir, "Tatort.cache")
+        with open(cachename, "rb") as file:
+            stored: bytes = file.read()
+        inode: int = os.stat(cachename).st_ino
+        outdated: float = time.time() - 3 * 86400
+        os.utime(cachename, (outdated, outdated))
+
+        content = self._get_cache().get_website_from_cache()
+        self.assertEqual(_Handler.body.decode("utf-8"), content)
+        self.assertEqual([200, 304], _Handler.statuses)
+        self.assertGreater(os.path.getmtime(cachename), outdated + 86400)
+        self.assertEqual(inode, os.stat(cachename).st_ino)
+        with open(cachename, "rb") as file:
+            self.assertEqual(stored, file.read())
+
+
+if __name__ == "__main__":
+    unittest.main()